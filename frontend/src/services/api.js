@@ -3,7 +3,9 @@
 const API_BASE_URL = 'http://localhost:8000';
 
 export const stockAPI = {
-    async searchStocks(query) {
+    // Results come back a page at a time; pass the previous response's
+    // next_cursor to load more.
+    async searchStocks(query, { limit = 10, cursor = null } = {}) {
       try {
         console.log('Searching for:', query); // Debug log
         const response = await fetch(`${API_BASE_URL}/search`, {
@@ -17,7 +19,9 @@ export const stockAPI = {
           body: JSON.stringify({ 
             query,
             include_historical: true, // Request historical data
-            days: 365 // Get 1 year of historical data
+            days: 365, // Get 1 year of historical data
+            limit,
+            cursor
           }),
         });
         
@@ -96,5 +100,96 @@ export const stockAPI = {
         console.error('Error stack:', error.stack);
         throw error;
       }
+    },
+
+    // Many quotes in one request. fields limits what the server fetches,
+    // e.g. ['current_price', 'daily_change_percent'] skips history and market cap.
+    async getQuotes(symbols, fields = null) {
+      const params = new URLSearchParams({ symbols: symbols.join(',') });
+      if (fields) {
+        params.set('fields', fields.join(','));
+      }
+      const response = await fetch(`${API_BASE_URL}/quotes?${params}`, {
+        method: 'GET',
+        headers: {
+          'Accept': 'application/json',
+        },
+        mode: 'cors',
+        credentials: 'omit',
+      });
+
+      if (!response.ok) {
+        const errorText = await response.text();
+        console.error('API Error:', response.status, errorText);
+        throw new Error(`API Error: ${response.status} - ${errorText}`);
+      }
+
+      // { results: { SYMBOL: {...} }, errors: { SYMBOL: message } }
+      return response.json();
+    },
+
+    async suggestSymbols(prefix, limit = 8) {
+      const params = new URLSearchParams({ q: prefix, limit: String(limit) });
+      const response = await fetch(`${API_BASE_URL}/symbols/suggest?${params}`, {
+        method: 'GET',
+        headers: {
+          'Accept': 'application/json',
+        },
+        mode: 'cors',
+        credentials: 'omit',
+      });
+
+      if (!response.ok) {
+        throw new Error(`API Error: ${response.status}`);
+      }
+
+      const data = await response.json();
+      return data.suggestions || [];
+    },
+
+    // Sector or industry statistics; pass name for a single group.
+    async getAggregates(groupBy = 'sector', name = null, top = 5) {
+      const params = new URLSearchParams({ group_by: groupBy, top: String(top) });
+      if (name) {
+        params.set('name', name);
+      }
+      const response = await fetch(`${API_BASE_URL}/aggregates?${params}`, {
+        method: 'GET',
+        headers: {
+          'Accept': 'application/json',
+        },
+        mode: 'cors',
+        credentials: 'omit',
+      });
+
+      if (!response.ok) {
+        throw new Error(`API Error: ${response.status}`);
+      }
+
+      return response.json();
+    },
+
+    // Live quote updates over a single WebSocket. onQuote receives
+    // { symbol, changes } with only the fields that changed.
+    // Returns a function that closes the subscription.
+    subscribeQuotes(symbols, onQuote) {
+      const socket = new WebSocket(`${API_BASE_URL.replace(/^http/, 'ws')}/ws/quotes`);
+
+      socket.onopen = () => {
+        socket.send(JSON.stringify({ action: 'subscribe', symbols }));
+      };
+      socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'quote') {
+          onQuote(message);
+        } else if (message.type === 'error') {
+          console.error('Quote stream error:', message.error);
+        }
+      };
+      socket.onerror = (error) => {
+        console.error('Quote stream error:', error);
+      };
+
+      return () => socket.close();
     }
 };
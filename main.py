@@ -1,27 +1,30 @@
 # main.py
 
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Request
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 from typing import List, Optional
 import asyncio
+import json
 import logging
-import sys
 import traceback
-from src.services.llm_service import LLMService
-from src.data.stock_client import StockClient
-from src.services.query_processor import QueryProcessor
-from src.services.parallel_processor import ParallelStockProcessor
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from src.config import Config
+from src.services.container import ServiceContainer
+from src.services.query_processor import InvalidCursorError
+from src.services.quote_hub import Subscription
+from src.services.sector_aggregates import GROUP_TYPES
+from src.services.profiling import install_profiling
+from src.logging_setup import LazyPayload, RequestContextMiddleware, configure_logging
+
+_import_ms = round((time.perf_counter() - _import_started) * 1000, 2)
+
+# Configure logging (LOG_MODE=json for queued, structured production logs)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Define the Pydantic model for the search query
@@ -29,8 +32,39 @@ class SearchQuery(BaseModel):
     query: str
     include_historical: Optional[bool] = True
     days: Optional[int] = 365
+    limit: int = 10
+    cursor: Optional[str] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the services once per worker and share them between requests"""
+    services = ServiceContainer()
+    services.phase_timings["imports"] = _import_ms
+    try:
+        logger.info("Initializing services...")
+        await services.start()
+        logger.info("Services initialized successfully")
+    except Exception as e:
+        logger.error(f"Error initializing services: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise
+    app.state.services = services
+    yield
+    await services.stop()
+
+def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
 
-app = FastAPI(title="Stock Research Automation")
+class BasketQuery(BaseModel):
+    symbols: List[str]
+    days: int = 365
+    benchmark: str = "SPY"
+    rolling_window: int = 20
+
+app = FastAPI(title="Stock Research Automation", lifespan=lifespan)
+
+# Per-request profiling, only installed when PROFILE_TOKEN or PROFILE_SAMPLE_RATE is set
+install_profiling(app)
 
 # Add CORS middleware with more permissive configuration
 app.add_middleware(
@@ -43,6 +77,9 @@ app.add_middleware(
     max_age=3600,
 )
 
+# Request IDs and per-request timing summaries in the logs
+app.add_middleware(RequestContextMiddleware)
+
 @app.options("/{path:path}")
 async def options_handler(request: Request):
     """Handle preflight requests"""
@@ -54,54 +91,80 @@ async def options_handler(request: Request):
     response.headers["Access-Control-Max-Age"] = "3600"
     return response
 
-try:
-    logger.info("Initializing services...")
-    llm_service = LLMService()
-    stock_client = StockClient()
-    query_processor = QueryProcessor(llm_service, stock_client)
-    parallel_processor = ParallelStockProcessor(max_workers=5)
-    logger.info("Services initialized successfully")
-except Exception as e:
-    logger.error(f"Error initializing services: {str(e)}")
-    logger.error(traceback.format_exc())
-    raise
-
 @app.get("/")
 async def root():
     return {"message": "Stock Research Automation API"}
 
+@app.get("/health")
+async def health(services: ServiceContainer = Depends(get_services)):
+    """Liveness check with startup timings, answered before any market data has been fetched.
+
+    Requests are only served once the lifespan has started every service, so
+    warmed_up in the report is the only part that changes after startup.
+    """
+    return {
+        "status": "ok",
+        "startup": services.startup_report(),
+    }
+
 @app.post("/search")
-async def search_stocks(search_query: SearchQuery, request: Request):
+async def search_stocks(search_query: SearchQuery, request: Request, services: ServiceContainer = Depends(get_services)):
     """Search stocks based on natural language query"""
     try:
         logger.info(f"Processing search query: {search_query.query}")
-        logger.debug(f"Request headers: {request.headers}")
+        logger.debug("Request headers: %s", LazyPayload(request.headers))
         logger.debug(f"Include historical: {search_query.include_historical}, Days: {search_query.days}")
+        limit = max(1, min(search_query.limit, Config.SEARCH_MAX_LIMIT))
         
-        # Pass historical data parameters to the query processor
-        result = await query_processor.process_query(
+        # Pass historical data and paging parameters to the query processor
+        result = await services.query_processor.process_query(
             search_query.query,
             include_historical=search_query.include_historical,
-            days=search_query.days
+            days=search_query.days,
+            limit=limit,
+            cursor=search_query.cursor
         )
         logger.info(f"Search completed successfully")
-        logger.debug(f"Search result: {result}")
+        logger.debug("Search result: %s", LazyPayload(result))
         
         response = JSONResponse(content=result)
         response.headers["Access-Control-Allow-Origin"] = "*"
         return response
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error processing search query: {str(e)}")
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/quotes")
+async def get_quotes(symbols: str, fields: Optional[str] = None, days: Optional[int] = 365,
+                     services: ServiceContainer = Depends(get_services)):
+    """Quotes for many comma-separated symbols, limited to the requested fields"""
+    symbol_list = [s for s in symbols.split(",") if s.strip()]
+    if not symbol_list:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(symbol_list) > Config.BATCH_QUOTE_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {Config.BATCH_QUOTE_MAX_SYMBOLS} symbols per request")
+    field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        logger.info(f"Fetching quotes for {len(symbol_list)} symbols, fields: {field_list or 'default'}")
+        return await services.stock_client.get_quotes(symbol_list, fields=field_list, days=days)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error fetching quotes: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/stocks/{symbol}")
-async def get_stock_info(symbol: str, include_historical: Optional[bool] = True, days: Optional[int] = 365):
+async def get_stock_info(symbol: str, include_historical: Optional[bool] = True, days: Optional[int] = 365,
+                         services: ServiceContainer = Depends(get_services)):
     """Get detailed information about a specific stock"""
     try:
         logger.info(f"Fetching stock info for symbol: {symbol}")
         logger.debug(f"Include historical: {include_historical}, Days: {days}")
-        result = await stock_client.get_stock_details(symbol, include_historical=include_historical, days=days)
+        result = await services.stock_client.get_stock_details(symbol, include_historical=include_historical, days=days)
         logger.info(f"Successfully retrieved stock info for {symbol}")
         return result
     except Exception as e:
@@ -109,12 +172,46 @@ async def get_stock_info(symbol: str, include_historical: Optional[bool] = True,
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/symbols/suggest")
+async def suggest_symbols(q: str, limit: Optional[int] = 8, services: ServiceContainer = Depends(get_services)):
+    """Typeahead matches for the search box by ticker or company name"""
+    limit = max(1, min(limit, 50))
+    return {"query": q, "suggestions": services.query_processor.symbol_index.suggest(q, limit)}
+
+@app.get("/cache/stats")
+async def cache_stats(services: ServiceContainer = Depends(get_services)):
+    """Hit ratios and size of the search result cache and the shared data cache"""
+    return {
+        "search": services.query_processor.search_cache.stats(),
+        "shared": services.cache.stats(),
+    }
+
+@app.get("/aggregates")
+async def get_aggregates(group_by: str = "sector", name: Optional[str] = None, top: Optional[int] = 5,
+                         services: ServiceContainer = Depends(get_services)):
+    """Running sector/industry statistics built from the quotes seen so far"""
+    if group_by not in GROUP_TYPES:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {list(GROUP_TYPES)}")
+    top = max(0, min(top, 50))
+    aggregates = services.query_processor.sector_aggregates
+    aggregates.expire()
+    if name is not None:
+        group = aggregates.get(group_by, name)
+        if group is None:
+            raise HTTPException(status_code=404, detail=f"Unknown {group_by}: {name}")
+        return group.snapshot(top)
+    return {
+        "group_by": group_by,
+        "groups": [group.snapshot(top) for group in aggregates.list(group_by)],
+    }
+
 @app.post("/process-stocks")
-async def process_stocks(symbols: List[str], batch_size: Optional[int] = 10):
+async def process_stocks(symbols: List[str], batch_size: Optional[int] = 10,
+                         services: ServiceContainer = Depends(get_services)):
     """Process multiple stocks in parallel with efficient batching"""
     try:
         logger.info(f"Processing batch of stocks: {symbols}")
-        result = await parallel_processor.process_with_progress(symbols, batch_size)
+        result = await services.parallel_processor.process_with_progress(symbols, batch_size)
         logger.info("Batch processing completed successfully")
         return result
     except Exception as e:
@@ -122,6 +219,81 @@ async def process_stocks(symbols: List[str], batch_size: Optional[int] = 10):
         logger.error(traceback.format_exc())
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/analytics/basket")
+async def analyze_basket(basket_query: BasketQuery, services: ServiceContainer = Depends(get_services)):
+    """Correlation, beta, returns, drawdowns and volatility for a basket of symbols"""
+    if not basket_query.symbols:
+        raise HTTPException(status_code=400, detail="At least one symbol is required")
+    if len(basket_query.symbols) > Config.ANALYTICS_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {Config.ANALYTICS_MAX_SYMBOLS} symbols per basket")
+    if basket_query.rolling_window < 1:
+        raise HTTPException(status_code=400, detail="rolling_window must be at least 1")
+    try:
+        logger.info(f"Analyzing basket of {len(basket_query.symbols)} symbols against {basket_query.benchmark}")
+        return await services.basket_analytics.analyze(
+            basket_query.symbols,
+            days=basket_query.days,
+            benchmark=basket_query.benchmark,
+            rolling_window=basket_query.rolling_window
+        )
+    except Exception as e:
+        logger.error(f"Error analyzing basket: {str(e)}")
+        logger.error(traceback.format_exc())
+        raise HTTPException(status_code=500, detail=str(e))
+
+async def _forward_quotes(websocket: WebSocket, subscription: Subscription):
+    """Drain a subscription's outbox into its WebSocket"""
+    while True:
+        message = await subscription.queue.get()
+        if message is None:
+            # The hub dropped this client for falling behind
+            await websocket.close(code=1013, reason="Client too slow")
+            return
+        await websocket.send_json(message)
+
+@app.websocket("/ws/quotes")
+async def live_quotes(websocket: WebSocket):
+    """Stream quote changes for subscribed symbols.
+
+    Clients send {"action": "subscribe" | "unsubscribe", "symbols": [...]}.
+    """
+    hub = websocket.app.state.services.quote_hub
+    await websocket.accept()
+    subscription = hub.connect()
+    sender = asyncio.create_task(_forward_quotes(websocket, subscription))
+    try:
+        while not sender.done():
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                hub.send(subscription, {"type": "error", "error": "Messages must be JSON"})
+                continue
+            if not isinstance(message, dict):
+                hub.send(subscription, {"type": "error", "error": "Messages must be JSON objects"})
+                continue
+            action = message.get("action")
+            symbols = message.get("symbols") or []
+            if isinstance(symbols, str):
+                symbols = [symbols]
+            if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+                hub.send(subscription, {"type": "error", "error": "symbols must be a list of strings"})
+                continue
+            if action == "subscribe":
+                added = hub.subscribe(subscription, symbols)
+                hub.send(subscription, {"type": "subscribed", "symbols": added})
+            elif action == "unsubscribe":
+                hub.unsubscribe(subscription, symbols)
+                hub.send(subscription, {"type": "unsubscribed", "symbols": symbols})
+            else:
+                hub.send(subscription, {"type": "error", "error": f"Unknown action: {action}"})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Quote socket error: {str(e)}")
+    finally:
+        hub.disconnect(subscription)
+        sender.cancel()
+
 @app.get("/batch-status/{batch_id}")
 async def get_batch_status(batch_id: str):
     """Get status of a batch processing job"""
@@ -13,4 +13,54 @@ class Config:
     
     # API Settings
     BATCH_SIZE = int(os.getenv("BATCH_SIZE", "5"))
-    API_TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
\ No newline at end of file
+    API_TIMEOUT = int(os.getenv("API_TIMEOUT", "30"))
+
+    # Shared cache (sqlite | redis | memory | none)
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
+    CACHE_PATH = os.getenv("CACHE_PATH", "./stock_cache.db")
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "60"))
+    MARKET_CAP_CACHE_TTL = float(os.getenv("MARKET_CAP_CACHE_TTL", "300"))
+    HISTORY_CACHE_TTL = float(os.getenv("HISTORY_CACHE_TTL", "3600"))
+    ANALYSIS_CACHE_TTL = float(os.getenv("ANALYSIS_CACHE_TTL", "900"))
+    CACHE_LEASE_TIMEOUT = float(os.getenv("CACHE_LEASE_TIMEOUT", "15"))
+    CACHE_POLL_INTERVAL = float(os.getenv("CACHE_POLL_INTERVAL", "0.05"))
+    CACHE_PURGE_INTERVAL = float(os.getenv("CACHE_PURGE_INTERVAL", "300"))
+    CACHE_BUSY_TIMEOUT = float(os.getenv("CACHE_BUSY_TIMEOUT", "0.25"))  # seconds a write waits on a locked file
+
+    # Basket analytics
+    ANALYTICS_MAX_SYMBOLS = int(os.getenv("ANALYTICS_MAX_SYMBOLS", "500"))
+    ANALYTICS_FETCH_CONCURRENCY = int(os.getenv("ANALYTICS_FETCH_CONCURRENCY", "20"))
+
+    # Live quote hub (WebSocket)
+    QUOTE_HUB_POLL_INTERVAL = float(os.getenv("QUOTE_HUB_POLL_INTERVAL", "5"))
+    QUOTE_HUB_MAX_QUEUE = int(os.getenv("QUOTE_HUB_MAX_QUEUE", "100"))
+    QUOTE_HUB_MAX_SYMBOLS = int(os.getenv("QUOTE_HUB_MAX_SYMBOLS", "50"))
+    QUOTE_HUB_FETCH_CONCURRENCY = int(os.getenv("QUOTE_HUB_FETCH_CONCURRENCY", "10"))
+
+    # Batch quotes
+    BATCH_QUOTE_MAX_SYMBOLS = int(os.getenv("BATCH_QUOTE_MAX_SYMBOLS", "100"))
+    BATCH_QUOTE_CONCURRENCY = int(os.getenv("BATCH_QUOTE_CONCURRENCY", "10"))
+
+    # Request profiling (requires pyinstrument); off unless a token or sample rate is set
+    PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "./profiles")
+    PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope")  # speedscope | html
+    PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.001"))
+
+    # Search paging and result cache (per process)
+    SEARCH_MAX_LIMIT = int(os.getenv("SEARCH_MAX_LIMIT", "50"))
+    SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+    SEARCH_CACHE_MAX_AGE = float(os.getenv("SEARCH_CACHE_MAX_AGE", "120"))
+    SEARCH_PARSE_MEMO_SIZE = int(os.getenv("SEARCH_PARSE_MEMO_SIZE", "1024"))
+    SEARCH_PARSE_MEMO_TTL = float(os.getenv("SEARCH_PARSE_MEMO_TTL", "3600"))
+    # Share of a sector/industry with fresh quotes needed to answer from the aggregates
+    GROUP_QUERY_MIN_COVERAGE = float(os.getenv("GROUP_QUERY_MIN_COVERAGE", "1.0"))
+
+    # Logging: text writes synchronously, json is queued and written by a background thread
+    LOG_MODE = os.getenv("LOG_MODE", "text")
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "DEBUG")
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
+    LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "500"))
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
@@ -0,0 +1,300 @@
+# src/data/cache.py
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+class CacheBackend:
+    """Base class for JSON value caches shared between request handlers.
+
+    Values are stored serialized so every read hands back a fresh copy that
+    callers are free to mutate. Backends also provide a short-lived lease so
+    only one caller (in any worker process) fetches a missing key upstream.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+    async def get_or_fetch(
+        self,
+        key: str,
+        ttl: float,
+        fetch: Callable[[], Awaitable[Any]],
+        lease_timeout: float = None,
+    ) -> Any:
+        """Return the cached value for key, fetching it at most once across workers.
+
+        On a miss the caller tries to take the key's lease. The lease holder runs
+        fetch and stores the result; everybody else polls until the value shows
+        up, or until the lease is free again (the holder failed) and they can
+        take it themselves. None results are never cached.
+        """
+        value = await self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        lease_timeout = lease_timeout or Config.CACHE_LEASE_TIMEOUT
+        owner = uuid.uuid4().hex
+        deadline = time.monotonic() + lease_timeout
+        while not await self.acquire_lease(key, owner, lease_timeout):
+            if time.monotonic() >= deadline:
+                logger.warning(f"Timed out waiting for cache lease on {key}, fetching directly")
+                break
+            # Another caller is fetching this key, wait for its result
+            await asyncio.sleep(Config.CACHE_POLL_INTERVAL)
+            value = await self.get(key)
+            if value is not None:
+                return value
+
+        try:
+            value = await fetch()
+            if value is not None:
+                await self.set(key, value, ttl)
+            return value
+        finally:
+            await self.release_lease(key, owner)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+class NullCache(CacheBackend):
+    """Cache that stores nothing, every lookup goes upstream."""
+
+    async def get(self, key: str) -> Optional[Any]:
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        pass
+
+    async def delete(self, key: str) -> None:
+        pass
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        return True
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        pass
+
+class MemoryCache(CacheBackend):
+    """Per-process cache, useful for a single worker and for tests"""
+
+    def __init__(self):
+        super().__init__()
+        self._values: Dict[str, tuple] = {}
+        self._leases: Dict[str, tuple] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at <= time.time():
+            self._values.pop(key, None)
+            return None
+        return json.loads(payload)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._values[key] = (time.time() + ttl, json.dumps(value))
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        lease = self._leases.get(key)
+        if lease and lease[1] > now:
+            return False
+        self._leases[key] = (owner, now + ttl)
+        return True
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        lease = self._leases.get(key)
+        if lease and lease[0] == owner:
+            self._leases.pop(key, None)
+
+class SQLiteCache(CacheBackend):
+    """Cache stored in a local SQLite file in WAL mode.
+
+    Every uvicorn worker on the host opens the same file, so a value fetched
+    by one worker is served to all of them. Reads never wait for writers in
+    WAL mode and run inline; writes can wait on another worker's lock, so they
+    run on a thread. A cache that stays locked is treated as a miss. Each
+    thread gets its own connection and close() closes all of them.
+    """
+
+    def __init__(self, path: str = None):
+        super().__init__()
+        self.path = path or Config.CACHE_PATH
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            "key TEXT PRIMARY KEY, owner TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._last_purge = 0.0
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=Config.CACHE_BUSY_TIMEOUT,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    async def _write(self, sql: str, params: tuple) -> Optional[int]:
+        """Run a write statement off the event loop; rowcount, or None if the cache is locked"""
+        def run():
+            return self._connection().execute(sql, params).rowcount
+        try:
+            return await asyncio.to_thread(run)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cache write skipped: {str(e)}")
+            return None
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            row = self._connection().execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.OperationalError as e:
+            logger.warning(f"Cache read failed for {key}: {str(e)}")
+            return None
+        if row is None or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        await self._write(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), now + ttl),
+        )
+        # Drop expired rows now and then so the file doesn't grow forever
+        if now - self._last_purge > Config.CACHE_PURGE_INTERVAL:
+            self._last_purge = now
+            await self._write("DELETE FROM cache WHERE expires_at <= ?", (now,))
+            await self._write("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+    async def delete(self, key: str) -> None:
+        await self._write("DELETE FROM cache WHERE key = ?", (key,))
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        now = time.time()
+        rowcount = await self._write(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at <= ?",
+            (key, owner, now + ttl, now),
+        )
+        # If the lease table is locked, fetch without coordination rather than wait
+        return rowcount is None or rowcount == 1
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        await self._write("DELETE FROM leases WHERE key = ? AND owner = ?", (key, owner))
+
+    async def close(self) -> None:
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            # Threads still holding a closed connection open a new one if reused
+            self._local = threading.local()
+        for conn in connections:
+            conn.close()
+
+class RedisCache(CacheBackend):
+    """Cache backed by a Redis-compatible server (Redis, Valkey, KeyDB...)"""
+
+    # Delete the lease only if it still belongs to owner, in one round trip
+    RELEASE_SCRIPT = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url: str = None):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError("The redis cache backend requires the 'redis' package") from e
+        self.client = redis.from_url(url or Config.CACHE_REDIS_URL)
+        self.prefix = "stock-research:"
+
+    async def get(self, key: str) -> Optional[Any]:
+        payload = await self.client.get(self.prefix + key)
+        if payload is None:
+            return None
+        return json.loads(payload)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self.client.set(self.prefix + key, json.dumps(value), px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self.client.delete(self.prefix + key)
+
+    async def acquire_lease(self, key: str, owner: str, ttl: float) -> bool:
+        return bool(await self.client.set(
+            self.prefix + "lease:" + key, owner, nx=True, px=int(ttl * 1000)
+        ))
+
+    async def release_lease(self, key: str, owner: str) -> None:
+        await self.client.eval(self.RELEASE_SCRIPT, 1, self.prefix + "lease:" + key, owner)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+def create_cache(backend: str = None) -> CacheBackend:
+    """Build the cache backend selected by CACHE_BACKEND"""
+    backend = (backend or Config.CACHE_BACKEND).lower()
+    if backend == "sqlite":
+        return SQLiteCache()
+    if backend == "redis":
+        return RedisCache()
+    if backend == "memory":
+        return MemoryCache()
+    if backend == "none":
+        return NullCache()
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -1,22 +1,51 @@
 # src/data/stock_client.py
+#
+# yfinance, pandas and numpy are imported where they are used so that importing
+# this module (and starting the API) stays cheap.
 
-import yfinance as yf
 from src.config import Config
-import pandas as pd
-import numpy as np
-from typing import Dict, List, Any, Optional
-import time
+from src.data.cache import CacheBackend, MemoryCache
+from src.logging_setup import LazyPayload
+from typing import Callable, Dict, List, Any, Optional
+import asyncio
 import logging
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# Quote fields grouped by the upstream call that provides them
+PRICE_FIELDS = {
+    "current_price", "volume", "day_high", "day_low", "day_open",
+    "daily_change", "daily_change_percent",
+}
+MARKET_CAP_FIELDS = {"market_cap", "market_cap_formatted"}
+HISTORY_FIELDS = {"historical_data"}
+QUOTE_FIELDS = PRICE_FIELDS | MARKET_CAP_FIELDS | HISTORY_FIELDS
+
 class StockClient:
-    def __init__(self):
+    def __init__(self, cache: CacheBackend = None):
         self.batch_size = Config.BATCH_SIZE
+        self.cache = cache or MemoryCache()
+        self.quote_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
+
+    def add_quote_listener(self, listener: Callable[[str, Dict[str, Any]], None]):
+        """Call listener(symbol, fields) with every price or market cap the client returns"""
+        self.quote_listeners.append(listener)
+
+    def _notify(self, symbol: str, data: Optional[Dict[str, Any]]):
+        if not data:
+            return
+        for listener in self.quote_listeners:
+            try:
+                listener(symbol, data)
+            except Exception as e:
+                logger.error(f"Quote listener failed for {symbol}: {str(e)}")
 
     def _safe_convert(self, value: Any) -> Any:
         """Safely convert numpy/pandas types to JSON-serializable Python types"""
+        import numpy as np
+        import pandas as pd
+
         if pd.isna(value):
             return None
         if isinstance(value, (np.integer, np.int64)):
@@ -46,6 +75,8 @@ class StockClient:
 
     def _get_historical_data(self, symbol: str, days: int = 365) -> Optional[Dict[str, List]]:
         """Fetch historical data using yfinance download function"""
+        import yfinance as yf
+
         try:
             # Calculate start and end dates
             end_date = datetime.now()  # Today
@@ -88,6 +119,168 @@ class StockClient:
         except Exception as e:
             logger.error(f"Error fetching historical data for {symbol}: {str(e)}")
             return None
+
+    def _fetch_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch the latest price snapshot and daily change from Yahoo Finance"""
+        import yfinance as yf
+
+        # Get current price data (2 days for calculating daily change)
+        hist = yf.Ticker(symbol).history(period="2d")
+        if hist.empty:
+            return None
+
+        # Get the most recent day's data
+        latest_data = hist.iloc[-1]
+
+        price = {
+            "symbol": symbol,
+            "current_price": round(self._safe_convert(latest_data['Close']), 2),
+            "volume": self._safe_convert(latest_data['Volume']),
+            "day_high": round(self._safe_convert(latest_data['High']), 2),
+            "day_low": round(self._safe_convert(latest_data['Low']), 2),
+            "day_open": round(self._safe_convert(latest_data['Open']), 2)
+        }
+
+        # Calculate daily change
+        daily_change = price['current_price'] - price['day_open']
+        daily_change_percent = (daily_change / price['day_open']) * 100
+        price.update({
+            "daily_change": round(daily_change, 2),
+            "daily_change_percent": round(daily_change_percent, 2)
+        })
+        return price
+
+    def _fetch_market_cap(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Fetch market cap from Yahoo Finance; empty dict when Yahoo has none"""
+        import yfinance as yf
+
+        try:
+            info = yf.Ticker(symbol).fast_info
+            market_cap = self._safe_convert(getattr(info, 'market_cap', None)) if info else None
+            if not market_cap:
+                return {}
+            return {
+                "market_cap": market_cap,
+                "market_cap_formatted": self._format_market_cap(market_cap)
+            }
+        except Exception as e:
+            logger.error(f"Error fetching additional info for {symbol}: {str(e)}")
+            return None
+
+    async def get_price(self, symbol: str, max_age: float = None) -> Optional[Dict[str, Any]]:
+        """Latest price snapshot for symbol, shared through the cache by all workers.
+
+        Callers that need fresher data than QUOTE_CACHE_TTL (the live quote hub)
+        pass max_age; their refreshes also update the regular price entry.
+        """
+        if max_age is None:
+            price = await self.cache.get_or_fetch(
+                f"price:{symbol}",
+                Config.QUOTE_CACHE_TTL,
+                lambda: asyncio.to_thread(self._fetch_price, symbol)
+            )
+        else:
+            price = await self.cache.get_or_fetch(
+                f"live-price:{symbol}",
+                max_age,
+                lambda: self._refresh_price(symbol)
+            )
+        self._notify(symbol, price)
+        return price
+
+    async def _refresh_price(self, symbol: str) -> Optional[Dict[str, Any]]:
+        price = await asyncio.to_thread(self._fetch_price, symbol)
+        if price is not None:
+            await self.cache.set(f"price:{symbol}", price, Config.QUOTE_CACHE_TTL)
+        return price
+
+    async def get_market_cap(self, symbol: str) -> Dict[str, Any]:
+        """Market cap fields for symbol (possibly empty), shared through the cache"""
+        market_cap = await self.cache.get_or_fetch(
+            f"market-cap:{symbol}",
+            Config.MARKET_CAP_CACHE_TTL,
+            lambda: asyncio.to_thread(self._fetch_market_cap, symbol)
+        )
+        self._notify(symbol, market_cap)
+        return market_cap or {}
+
+    async def get_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Latest price snapshot merged with market cap"""
+        price = await self.get_price(symbol)
+        if price is None:
+            # Unknown or delisted symbol, don't bother looking up market cap
+            return None
+        price.update(await self.get_market_cap(symbol))
+        return price
+
+    async def get_quotes(self, symbols: List[str], fields: List[str] = None, days: int = 365) -> Dict[str, Any]:
+        """Quotes for many symbols, fetching only what the requested fields need.
+
+        Failures are reported per symbol in "errors" instead of failing the batch.
+        """
+        # "symbol" is always part of each result, asking for it is a no-op
+        fields = set(fields) - {"symbol"} if fields else set()
+        fields = fields or PRICE_FIELDS | MARKET_CAP_FIELDS
+        unknown = fields - QUOTE_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown fields: {sorted(unknown)}")
+
+        need_price = bool(fields & PRICE_FIELDS)
+        need_market_cap = bool(fields & MARKET_CAP_FIELDS)
+        need_history = bool(fields & HISTORY_FIELDS)
+        semaphore = asyncio.Semaphore(Config.BATCH_QUOTE_CONCURRENCY)
+        results, errors = {}, {}
+
+        async def load(symbol: str):
+            async with semaphore:
+                try:
+                    lookups = {}
+                    if need_price:
+                        lookups["price"] = self.get_price(symbol)
+                    if need_market_cap:
+                        lookups["market_cap"] = self.get_market_cap(symbol)
+                    if need_history:
+                        lookups["history"] = self.get_historical_data(symbol, days)
+                    found = dict(zip(lookups, await asyncio.gather(*lookups.values())))
+                    price, market_cap, history = found.get("price"), found.get("market_cap"), found.get("history")
+
+                    if need_price and price is None:
+                        errors[symbol] = f"No data available for {symbol}"
+                        return
+                    if need_history and history is None and not (need_price or need_market_cap):
+                        errors[symbol] = f"No historical data available for {symbol}"
+                        return
+
+                    available = dict(price or {})
+                    available.update(market_cap or {})
+                    if history:
+                        available["historical_data"] = history
+                    found_fields = {f: available[f] for f in fields if f in available}
+                    if not found_fields:
+                        errors[symbol] = f"None of the requested fields are available for {symbol}"
+                        return
+                    results[symbol] = {"symbol": symbol}
+                    results[symbol].update(found_fields)
+                except Exception as e:
+                    logger.error(f"Error fetching quote for {symbol}: {str(e)}")
+                    errors[symbol] = str(e)
+
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        await asyncio.gather(*[load(symbol) for symbol in symbols])
+        return {
+            "fields": sorted(fields),
+            "results": {s: results[s] for s in symbols if s in results},
+            "errors": errors,
+        }
+
+    async def get_historical_data(self, symbol: str, days: int = 365) -> Optional[Dict[str, List]]:
+        """Daily closing prices for symbol, shared through the cache by all workers"""
+        return await self.cache.get_or_fetch(
+            f"history:{symbol}:{days}",
+            Config.HISTORY_CACHE_TTL,
+            lambda: asyncio.to_thread(self._get_historical_data, symbol, days)
+        )
+
     async def get_stock_details(self, symbol: str, include_historical: bool = True, days: int = 365) -> Dict[str, Any]:
         """Fetch detailed stock information from Yahoo Finance"""
         max_retries = 3
@@ -97,71 +290,34 @@ class StockClient:
             try:
                 # Add delay between attempts
                 if attempt > 0:
-                    time.sleep(retry_delay)
+                    await asyncio.sleep(retry_delay)
                 
-                logger.info(f"Fetching data for {symbol}")
-                ticker = yf.Ticker(symbol)
-
-                # Get current price data (2 days for calculating daily change)
-                hist = ticker.history(period="2d")
-                if hist.empty:
+                logger.debug("Fetching data for %s", symbol)
+                quote = await self.get_quote(symbol)
+                if quote is None:
                     logger.warning(f"No current price data available for {symbol}")
                     return {
                         "error": f"No data available for {symbol}",
                         "symbol": symbol
                     }
 
-                # Get the most recent day's data
-                latest_data = hist.iloc[-1]
-                
                 # Build base response
-                response = {
-                    "symbol": symbol,
-                    "current_price": round(self._safe_convert(latest_data['Close']), 2),
-                    "volume": self._safe_convert(latest_data['Volume']),
-                    "day_high": round(self._safe_convert(latest_data['High']), 2),
-                    "day_low": round(self._safe_convert(latest_data['Low']), 2),
-                    "day_open": round(self._safe_convert(latest_data['Open']), 2)
-                }
+                response = quote
 
                 # Fetch and add historical data if requested
                 if include_historical:
-                    historical_data = self._get_historical_data(symbol, days)
+                    historical_data = await self.get_historical_data(symbol, days)
                     if historical_data:
                         response["historical_data"] = historical_data
-                        logger.info(f"Historical data added to response for {symbol}")
+                        logger.debug("Historical data added to response for %s", symbol)
                     else:
                         logger.warning(f"Failed to get historical data for {symbol}")
 
-                # Try to get additional info
-                try:
-                    info = ticker.fast_info
-                    if info:
-                        market_cap = self._safe_convert(getattr(info, 'market_cap', None))
-                        if market_cap:
-                            response.update({
-                                "market_cap": market_cap,
-                                "market_cap_formatted": self._format_market_cap(market_cap)
-                            })
-                except Exception as e:
-                    logger.error(f"Error fetching additional info for {symbol}: {str(e)}")
-
-                # Calculate daily change
-                if all(k in response for k in ['current_price', 'day_open']):
-                    daily_change = response['current_price'] - response['day_open']
-                    daily_change_percent = (daily_change / response['day_open']) * 100
-                    response.update({
-                        "daily_change": round(daily_change, 2),
-                        "daily_change_percent": round(daily_change_percent, 2)
-                    })
-
                 # Log the final response structure
-                logger.info(f"Response structure for {symbol}:")
-                logger.info(f"Keys in response: {list(response.keys())}")
-                if "historical_data" in response:
-                    logger.info(f"Historical data present with {len(response['historical_data']['dates'])} data points")
-                else:
-                    logger.info(f"No historical data in response for {symbol}")
+                logger.debug(
+                    "Response for %s has keys %s and %s historical data points", symbol, LazyPayload(response.keys()),
+                    len(response["historical_data"]["dates"]) if "historical_data" in response else 0
+                )
 
                 return response
 
@@ -0,0 +1,253 @@
+# src/loadtest/runner.py
+#
+# In-process HTTP load test for the API in main.py with stubbed upstreams.
+#
+#   python -m src.loadtest.runner --rps 50 --duration 30 --save-baseline loadtest_baseline.json
+#   python -m src.loadtest.runner --rps 50 --duration 30 --baseline loadtest_baseline.json
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Any, Optional
+from src.loadtest.stubs import UpstreamSettings, install_stubs
+
+logger = logging.getLogger(__name__)
+
+SYMBOLS = ["AAPL", "MSFT", "GOOG", "AMZN", "META", "NVDA", "AMD", "INTC",
+           "EQIX", "DLR", "CRM", "TSM", "ASML", "AMAT", "XOM", "CVX", "JPM", "BAC", "GS"]
+SEARCH_QUERIES = ["technology stocks", "semiconductor companies", "energy", "banks",
+                  "nvidia", "AAPL", "large cap tech", "data centers"]
+
+DEFAULT_MIX = {"search": 0.4, "stocks": 0.5, "process": 0.1}
+
+# Baseline comparison: metric path, and whether larger values are worse
+COMPARED_METRICS = [
+    (("throughput_rps",), False),
+    (("latency_ms", "p50"), True),
+    (("latency_ms", "p95"), True),
+    (("latency_ms", "p99"), True),
+    (("event_loop_lag_ms", "p99"), True),
+    (("error_rate",), True),
+]
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile, None for an empty sample"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return round(ordered[rank], 2)
+
+def latency_summary(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": round(max(values), 2) if values else None,
+    }
+
+def summarize(samples: List[Dict[str, Any]], lag_samples: List[float], elapsed: float,
+              shed: int = 0) -> Dict[str, Any]:
+    """Aggregate raw request samples into the report format"""
+    per_endpoint = {}
+    for endpoint in sorted({s["endpoint"] for s in samples}):
+        endpoint_samples = [s for s in samples if s["endpoint"] == endpoint]
+        errors = sum(1 for s in endpoint_samples if not s["ok"])
+        per_endpoint[endpoint] = {
+            "requests": len(endpoint_samples),
+            "errors": errors,
+            "error_rate": round(errors / len(endpoint_samples), 4),
+            "latency_ms": latency_summary([s["latency_ms"] for s in endpoint_samples]),
+        }
+
+    errors = sum(1 for s in samples if not s["ok"])
+    return {
+        "requests": len(samples),
+        "shed": shed,
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "latency_ms": latency_summary([s["latency_ms"] for s in samples]),
+        "event_loop_lag_ms": latency_summary(lag_samples),
+        "endpoints": per_endpoint,
+    }
+
+def compare_to_baseline(report: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.2) -> List[str]:
+    """Describe every metric that is more than tolerance worse than the baseline"""
+    regressions = []
+    for path, higher_is_worse in COMPARED_METRICS:
+        current, previous = report, baseline
+        for key in path:
+            current = (current or {}).get(key)
+            previous = (previous or {}).get(key)
+        if current is None or previous is None:
+            continue
+        name = ".".join(path)
+        if higher_is_worse:
+            # Small absolute floors keep near-zero baselines from flagging noise
+            floor = 0.01 if name == "error_rate" else 1.0
+            if current > max(previous * (1 + tolerance), previous + floor):
+                regressions.append(f"{name}: {current} vs baseline {previous}")
+        elif current < previous * (1 - tolerance):
+            regressions.append(f"{name}: {current} vs baseline {previous}")
+    return regressions
+
+async def _monitor_event_loop(lag_samples: List[float], stop: asyncio.Event, interval: float = 0.01):
+    """Measure how late the loop wakes a sleeping task; blocking calls show up here"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag_samples.append(max(0.0, (loop.time() - expected) * 1000))
+
+async def _send(client, endpoint: str):
+    if endpoint == "search":
+        return await client.post("/search", json={
+            "query": random.choice(SEARCH_QUERIES),
+            "include_historical": random.random() < 0.5,
+            "days": 365,
+        })
+    if endpoint == "stocks":
+        include_historical = "true" if random.random() < 0.5 else "false"
+        return await client.get(f"/stocks/{random.choice(SYMBOLS)}?include_historical={include_historical}")
+    if endpoint == "process":
+        return await client.post("/process-stocks", json=random.sample(SYMBOLS, 3))
+    raise ValueError(f"Unknown endpoint: {endpoint}")
+
+async def run_load_test(app, rps: float, duration: float, mix: Dict[str, float] = None,
+                        max_in_flight: int = 200, timeout: float = 30.0) -> Dict[str, Any]:
+    """Drive app at a fixed arrival rate (open loop) and return the report"""
+    import httpx
+
+    mix = mix or DEFAULT_MIX
+    endpoints, weights = zip(*mix.items())
+    samples: List[Dict[str, Any]] = []
+    lag_samples: List[float] = []
+    in_flight = set()
+    shed = 0
+
+    async def fire(client, endpoint):
+        started = time.perf_counter()
+        ok = False
+        try:
+            response = await asyncio.wait_for(_send(client, endpoint), timeout)
+            ok = response.status_code < 400
+        except Exception as e:
+            logger.debug(f"{endpoint} request failed: {e}")
+        samples.append({
+            "endpoint": endpoint,
+            "ok": ok,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        })
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+            stop = asyncio.Event()
+            monitor = asyncio.create_task(_monitor_event_loop(lag_samples, stop))
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            sent = 0
+
+            while loop.time() - started < duration:
+                # Schedule against the clock so a slow app doesn't lower the offered load
+                next_at = started + sent / rps
+                delay = next_at - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                sent += 1
+                if len(in_flight) >= max_in_flight:
+                    shed += 1
+                    continue
+                task = asyncio.create_task(fire(client, random.choices(endpoints, weights)[0]))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+
+            if in_flight:
+                await asyncio.wait(list(in_flight))
+            elapsed = loop.time() - started
+            stop.set()
+            await monitor
+
+    return summarize(samples, lag_samples, elapsed, shed)
+
+def _parse_mix(text: str) -> Dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight)
+    unknown = set(mix) - set(DEFAULT_MIX)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown endpoints in mix: {sorted(unknown)}")
+    return mix
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the API with stubbed upstreams")
+    parser.add_argument("--rps", type=float, default=20, help="target request rate")
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load")
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX,
+                        help="endpoint weights, e.g. search=0.4,stocks=0.5,process=0.1")
+    parser.add_argument("--max-in-flight", type=int, default=200)
+    parser.add_argument("--yfinance-latency", type=float, default=0.05)
+    parser.add_argument("--yfinance-error-rate", type=float, default=0.0)
+    parser.add_argument("--groq-latency", type=float, default=0.3)
+    parser.add_argument("--groq-error-rate", type=float, default=0.0)
+    parser.add_argument("--cache", default="memory", choices=["memory", "sqlite", "none"],
+                        help="cache backend for the run (sqlite uses a temporary file)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", help="compare against this report; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument("--save-baseline", help="write this run's report to the given path")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    install_stubs(
+        UpstreamSettings(latency=args.yfinance_latency, jitter=args.yfinance_latency / 4,
+                         error_rate=args.yfinance_error_rate),
+        UpstreamSettings(latency=args.groq_latency, jitter=args.groq_latency / 4,
+                         error_rate=args.groq_error_rate),
+    )
+
+    from src.config import Config
+    workdir = tempfile.mkdtemp(prefix="loadtest-")
+    Config.CACHE_BACKEND = args.cache
+    Config.CACHE_PATH = f"{workdir}/cache.db"
+    Config.DATABASE_URL = f"sqlite:///{workdir}/stocks.db"
+
+    import main as api
+    logging.getLogger().setLevel(args.log_level)
+
+    report = asyncio.run(run_load_test(api.app, args.rps, args.duration, args.mix, args.max_in_flight))
+    report["config"] = {
+        "rps": args.rps, "duration": args.duration, "mix": args.mix, "cache": args.cache,
+        "yfinance_latency": args.yfinance_latency, "yfinance_error_rate": args.yfinance_error_rate,
+        "groq_latency": args.groq_latency, "groq_error_rate": args.groq_error_rate,
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            return 1
+        print("No regressions against baseline", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# src/loadtest/stubs.py
+#
+# Offline stand-ins for the yfinance and groq modules used by the load test.
+# They are registered in sys.modules before the app first imports the real
+# libraries, so the application code runs unchanged.
+
+import json
+import random
+import sys
+import time
+import types
+from datetime import datetime, timedelta
+
+class UpstreamSettings:
+    """Latency (seconds) and error rate for one stubbed upstream"""
+
+    def __init__(self, latency: float = 0.05, jitter: float = 0.02, error_rate: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.calls = 0
+
+    def simulate(self, name: str):
+        """Block like a real network call, then fail at the configured rate.
+
+        time.sleep is deliberate: the real clients are synchronous, so a caller
+        that runs them on the event loop thread will show up as loop lag.
+        """
+        self.calls += 1
+        time.sleep(max(0.0, random.gauss(self.latency, self.jitter)))
+        if random.random() < self.error_rate:
+            raise ConnectionError(f"Simulated {name} failure")
+
+def _base_price(symbol: str) -> float:
+    return 20 + (sum(ord(c) for c in symbol) * 7919) % 500
+
+def build_yfinance(settings: UpstreamSettings) -> types.ModuleType:
+    import pandas as pd
+
+    module = types.ModuleType("yfinance")
+
+    class FastInfo:
+        def __init__(self, symbol):
+            self.market_cap = _base_price(symbol) * 1e9
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+
+        def history(self, period="2d"):
+            settings.simulate("yfinance")
+            base = _base_price(self.symbol)
+            today = pd.Timestamp(datetime.now().date())
+            price = base * (1 + random.uniform(-0.02, 0.02))
+            return pd.DataFrame(
+                {
+                    "Open": [base, base],
+                    "High": [base * 1.02, price * 1.01],
+                    "Low": [base * 0.98, price * 0.99],
+                    "Close": [base, price],
+                    "Volume": [1_000_000, random.randint(500_000, 5_000_000)],
+                },
+                index=[today - pd.Timedelta(days=1), today],
+            )
+
+        @property
+        def fast_info(self):
+            settings.simulate("yfinance")
+            return FastInfo(self.symbol)
+
+    def download(symbol, start=None, end=None, progress=False, show_errors=False):
+        settings.simulate("yfinance")
+        end_date = datetime.strptime(end, '%Y-%m-%d') if end else datetime.now()
+        start_date = datetime.strptime(start, '%Y-%m-%d') if start else end_date - timedelta(days=365)
+        dates = pd.bdate_range(start_date, end_date - timedelta(days=1))
+        base = _base_price(symbol)
+        prices = [base * (1 + 0.0005 * i + random.uniform(-0.01, 0.01)) for i in range(len(dates))]
+        return pd.DataFrame({"Close": prices}, index=dates)
+
+    module.Ticker = Ticker
+    module.download = download
+    return module
+
+ANALYSIS_RESPONSE = {
+    "performance_summary": "Stubbed performance summary",
+    "trading_volume_analysis": "Stubbed volume analysis",
+    "technical_signals": "Stubbed technical signals",
+    "market_sentiment": "Neutral",
+    "key_metrics": {
+        "price_strength": "neutral",
+        "volume_signal": "normal",
+        "trend": "neutral",
+        "volatility": "normal",
+    },
+}
+
+def _criteria_for(query: str) -> dict:
+    query = query.lower()
+    sectors = [s for s, words in {
+        "Technology": ("tech",), "Energy": ("energy", "oil"), "Finance": ("bank", "financ"),
+    }.items() if any(w in query for w in words)]
+    industries = ["Semiconductors"] if "semiconductor" in query else []
+    return {
+        "sectors": sectors,
+        "industries": industries,
+        "market_cap_min": None,
+        "market_cap_max": None,
+        "keywords": [],
+        "description": f"Stubbed interpretation of: {query}",
+    }
+
+def build_groq(settings: UpstreamSettings) -> types.ModuleType:
+    module = types.ModuleType("groq")
+
+    def create(model=None, messages=None, **kwargs):
+        settings.simulate("groq")
+        query = messages[-1]["content"]
+        if "Analyze this stock data" in query:
+            content = json.dumps(ANALYSIS_RESPONSE)
+        else:
+            content = json.dumps(_criteria_for(query))
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+    class Groq:
+        def __init__(self, api_key=None, **kwargs):
+            self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=create))
+
+    module.Groq = Groq
+    module.GroqError = Exception
+    return module
+
+def install_stubs(yfinance_settings: UpstreamSettings, groq_settings: UpstreamSettings):
+    """Register the stand-ins; must run before the app imports yfinance or groq"""
+    for name in ("yfinance", "groq"):
+        if name in sys.modules and not getattr(sys.modules[name], "__loadtest_stub__", False):
+            raise RuntimeError(f"{name} is already imported, install stubs before starting the app")
+    yfinance = build_yfinance(yfinance_settings)
+    groq = build_groq(groq_settings)
+    yfinance.__loadtest_stub__ = True
+    groq.__loadtest_stub__ = True
+    sys.modules["yfinance"] = yfinance
+    sys.modules["groq"] = groq
@@ -0,0 +1,224 @@
+# src/logging_setup.py
+#
+# Logging for the API. "text" mode writes synchronously (handy locally);
+# "json" mode hands records to a queue drained by a background thread, so the
+# event loop only pays for building the message.
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import reprlib
+import sys
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+stage_timings_var: ContextVar[Optional[Dict[str, float]]] = ContextVar("stage_timings", default=None)
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+
+_payload_repr = reprlib.Repr()
+_payload_repr.maxlist = 10
+_payload_repr.maxtuple = 10
+_payload_repr.maxdict = 20
+_payload_repr.maxstring = 200
+_payload_repr.maxother = 200
+_payload_repr.maxlevel = 4
+
+class LazyPayload:
+    """Log argument that renders a large value only if the record is emitted.
+
+    Rendering is bounded: long lists and dicts are elided by reprlib and the
+    result is cut at max_chars, so historical_data arrays never get formatted
+    in full.
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int = None):
+        self.value = value
+        self.max_chars = max_chars or Config.LOG_PAYLOAD_MAX_CHARS
+
+    def __str__(self) -> str:
+        text = _payload_repr.repr(self.value)
+        if len(text) > self.max_chars:
+            return f"{text[:self.max_chars]}... ({len(text)} chars)"
+        return text
+
+    __repr__ = __str__
+
+@contextmanager
+def timed_stage(name: str):
+    """Add how long the wrapped block took (ms) to the current request's stage timings"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = stage_timings_var.get()
+        if stages is not None:
+            stages[name] = round(stages.get(name, 0) + (time.perf_counter() - started) * 1000, 2)
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the request ID of the task that logged them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class DebugSampler(logging.Filter):
+    """Keep only a fraction of DEBUG records; other levels always pass"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; fields passed with extra={"fields": {...}} are merged in"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S") + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that counts and drops records when the queue is full.
+
+    Only the message arguments and traceback text are resolved on the calling
+    thread; the JSON line itself is built by the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+        self.exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            # Keep the traceback as its own field without holding on to the frames
+            record.exc_text = record.exc_text or self.exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_installed: Dict[str, Any] = {"handler": None, "listener": None}
+
+def configure_logging(mode: str = None, level: str = None, stream=None) -> logging.Handler:
+    """Install the root handler for mode ("text" or "json"), replacing a previous one"""
+    mode = (mode or Config.LOG_MODE).lower()
+    level = (level or Config.LOG_LEVEL).upper()
+    stream = stream or sys.stdout
+    if mode not in ("text", "json"):
+        raise ValueError(f"Unknown log mode: {mode}")
+    shutdown_logging()
+
+    output = logging.StreamHandler(stream)
+    if mode == "json":
+        output.setFormatter(JsonFormatter())
+        handler = DroppingQueueHandler(queue.Queue(maxsize=Config.LOG_QUEUE_SIZE))
+        listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=False)
+        listener.start()
+        _installed["listener"] = listener
+    else:
+        output.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handler = output
+
+    # Filters run before the record is rendered, so sampled-out debug records cost nothing
+    handler.addFilter(DebugSampler(Config.LOG_DEBUG_SAMPLE_RATE))
+    handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+    _installed["handler"] = handler
+    return handler
+
+def shutdown_logging():
+    """Remove the installed handler, flushing queued records first"""
+    handler, listener = _installed["handler"], _installed["listener"]
+    if listener is not None:
+        listener.stop()
+    if handler is not None:
+        logging.getLogger().removeHandler(handler)
+    _installed.update(handler=None, listener=None)
+
+atexit.register(shutdown_logging)
+
+class RequestContextMiddleware:
+    """Give each HTTP request an ID (X-Request-ID) and log one summary line with stage timings"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+        stages: Dict[str, float] = {}
+        id_token = request_id_var.set(request_id)
+        stages_token = stage_timings_var.set(stages)
+        status = {"code": 500}
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", request_id.encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            logger.info(
+                "%s %s %s in %sms", scope["method"], scope["path"], status["code"], duration_ms,
+                extra={"fields": {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status["code"],
+                    "duration_ms": duration_ms,
+                    "stages": stages,
+                }}
+            )
+            request_id_var.reset(id_token)
+            stage_timings_var.reset(stages_token)
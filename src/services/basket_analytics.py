@@ -0,0 +1,156 @@
+# src/services/basket_analytics.py
+
+import asyncio
+import logging
+import math
+from typing import Dict, List, Any, Optional
+from src.config import Config
+from src.data.stock_client import StockClient
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+class BasketAnalytics:
+    """Cross-sectional analytics (correlation, beta, returns, risk) for a basket of symbols"""
+
+    def __init__(self, stock_client: StockClient):
+        self.stock_client = stock_client
+        self.fetch_semaphore = asyncio.Semaphore(Config.ANALYTICS_FETCH_CONCURRENCY)
+
+    async def _fetch_history(self, symbol: str, days: int) -> Optional[Dict[str, List]]:
+        async with self.fetch_semaphore:  # Limit concurrent upstream fetches on cache misses
+            try:
+                return await self.stock_client.get_historical_data(symbol, days)
+            except Exception as e:
+                logger.error(f"Error fetching history for {symbol}: {str(e)}")
+                return None
+
+    async def analyze(self, symbols: List[str], days: int = 365, benchmark: str = "SPY",
+                      rolling_window: int = 20) -> Dict[str, Any]:
+        """Align the basket's price histories and compute all metrics in one pass"""
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+        benchmark = (benchmark or "SPY").strip().upper()
+        to_fetch = symbols if benchmark in symbols else symbols + [benchmark]
+
+        histories = await asyncio.gather(*[self._fetch_history(s, days) for s in to_fetch])
+        available = {s: h for s, h in zip(to_fetch, histories) if h and h.get("dates")}
+        missing = [s for s in to_fetch if s not in available]
+        if missing:
+            logger.warning(f"No history available for: {missing}")
+
+        # The pandas/NumPy work takes tens of milliseconds for large baskets,
+        # so it runs on a thread to keep the event loop responsive
+        prices = await asyncio.to_thread(self._build_price_matrix, available)
+        basket = [s for s in symbols if s in available]
+
+        result = {
+            "symbols": basket,
+            "benchmark": benchmark,
+            "days": days,
+            "rolling_window": rolling_window,
+            "missing": missing,
+        }
+        if prices is None or not basket:
+            result.update({"observations": 0, "correlation": {"symbols": [], "matrix": []}, "metrics": {}})
+            return result
+
+        result.update(await asyncio.to_thread(self._compute_metrics, prices, basket, benchmark, rolling_window))
+        return result
+
+    def _build_price_matrix(self, histories: Dict[str, Dict[str, List]]):
+        """Date-indexed DataFrame with one column of closing prices per symbol"""
+        import numpy as np
+        import pandas as pd
+
+        if not histories:
+            return None
+        symbols = list(histories)
+        dates = sorted(set().union(*(h["dates"] for h in histories.values())))
+        row_of = {d: i for i, d in enumerate(dates)}
+
+        matrix = np.full((len(dates), len(symbols)), np.nan)
+        for j, symbol in enumerate(symbols):
+            history = histories[symbol]
+            rows = [row_of[d] for d in history["dates"]]
+            matrix[rows, j] = history["prices"]
+
+        return pd.DataFrame(matrix, index=pd.to_datetime(dates), columns=symbols)
+
+    def _compute_metrics(self, prices, basket: List[str], benchmark: str, rolling_window: int) -> Dict[str, Any]:
+        import numpy as np
+
+        # Carry prices over holidays/gaps so returns line up across symbols
+        prices = prices.ffill()
+        returns = (prices / prices.shift(1) - 1).iloc[1:]
+        basket_returns = returns[basket]
+        r = basket_returns.to_numpy()
+
+        # Correlation matrix; fall back to pairwise-complete observations when
+        # histories have gaps, which is much slower than the dense BLAS path
+        if len(r) > 1 and not np.isnan(r).any():
+            with np.errstate(invalid="ignore", divide="ignore"):
+                correlation = np.atleast_2d(np.corrcoef(r, rowvar=False))
+        else:
+            correlation = basket_returns.corr().to_numpy()
+
+        # Beta against the benchmark, using rows where both sides have a return
+        if benchmark in returns:
+            b = returns[benchmark].to_numpy()[:, None]
+            valid = ~np.isnan(r) & ~np.isnan(b)
+            n = valid.sum(axis=0)
+            r0 = np.where(valid, r, 0.0)
+            b0 = np.where(valid, b, 0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r_mean = r0.sum(axis=0) / n
+                b_mean = b0.sum(axis=0) / n
+                r_dev = np.where(valid, r0 - r_mean, 0.0)
+                b_dev = np.where(valid, b0 - b_mean, 0.0)
+                beta = (r_dev * b_dev).sum(axis=0) / (b_dev ** 2).sum(axis=0)
+        else:
+            beta = np.full(len(basket), np.nan)
+
+        # Returns and drawdowns from the price matrix
+        basket_prices = prices[basket]
+        first_prices = basket_prices.bfill().iloc[0].to_numpy()
+        last_prices = basket_prices.iloc[-1].to_numpy()
+        total_return = last_prices / first_prices - 1
+        rolling_return = (basket_prices / basket_prices.shift(rolling_window) - 1).iloc[-1].to_numpy()
+        drawdown = basket_prices / basket_prices.cummax() - 1
+        max_drawdown = drawdown.min().to_numpy()
+        current_drawdown = drawdown.iloc[-1].to_numpy()
+        volatility = np.nanstd(r, axis=0, ddof=1) * math.sqrt(TRADING_DAYS_PER_YEAR) if len(r) > 1 \
+            else np.full(len(basket), np.nan)
+
+        columns = {
+            "beta": self._to_json(beta),
+            "total_return": self._to_json(total_return),
+            "rolling_return": self._to_json(rolling_return),
+            "max_drawdown": self._to_json(max_drawdown),
+            "current_drawdown": self._to_json(current_drawdown),
+            "annualized_volatility": self._to_json(volatility),
+        }
+        metrics = {
+            symbol: {name: values[i] for name, values in columns.items()}
+            for i, symbol in enumerate(basket)
+        }
+
+        return {
+            "start_date": prices.index[0].strftime('%Y-%m-%d'),
+            "end_date": prices.index[-1].strftime('%Y-%m-%d'),
+            "observations": len(prices),
+            "correlation": {
+                "symbols": basket,
+                "matrix": self._to_json(correlation),
+            },
+            "metrics": metrics,
+        }
+
+    def _to_json(self, values, digits: int = 4) -> List:
+        """Round an array for JSON output, mapping NaN/inf to None"""
+        import numpy as np
+
+        values = np.round(np.asarray(values, dtype="float64"), digits)
+        output = values.astype(object)
+        output[~np.isfinite(values)] = None
+        return output.tolist()
@@ -0,0 +1,94 @@
+# src/services/container.py
+
+import asyncio
+import importlib
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, Any
+from src.data.cache import create_cache
+from src.data.stock_client import StockClient
+from src.services.llm_service import LLMService
+from src.services.query_processor import QueryProcessor
+from src.services.parallel_processor import ParallelStockProcessor
+from src.services.basket_analytics import BasketAnalytics
+from src.services.quote_hub import QuoteHub
+
+logger = logging.getLogger(__name__)
+
+# Libraries that are slow to import, loaded in the background once the API is up
+HEAVY_MODULES = ["numpy", "pandas", "yfinance", "groq", "sqlalchemy"]
+
+class ServiceContainer:
+    """Builds the API services once per process and times each startup phase"""
+
+    def __init__(self):
+        self.cache = None
+        self.llm_service = None
+        self.stock_client = None
+        self.query_processor = None
+        self.parallel_processor = None
+        self.basket_analytics = None
+        self.quote_hub = None
+        self.ready = False
+        self.phase_timings: Dict[str, float] = {}
+        self._warmup_task = None
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record how long the wrapped block took, in milliseconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phase_timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    async def start(self, warm_up: bool = True):
+        """Construct all services; heavy libraries are left for the warm-up task"""
+        with self.phase("cache"):
+            self.cache = create_cache()
+        with self.phase("stock_client"):
+            self.stock_client = StockClient(self.cache)
+        with self.phase("llm_service"):
+            self.llm_service = LLMService(self.cache)
+        with self.phase("query_processor"):
+            self.query_processor = QueryProcessor(self.llm_service, self.stock_client)
+        with self.phase("parallel_processor"):
+            self.parallel_processor = ParallelStockProcessor(max_workers=5, stock_client=self.stock_client)
+        with self.phase("basket_analytics"):
+            self.basket_analytics = BasketAnalytics(self.stock_client)
+        with self.phase("quote_hub"):
+            self.quote_hub = QuoteHub(self.stock_client)
+            await self.quote_hub.start()
+
+        self.ready = True
+        logger.info(f"Services ready, startup phases (ms): {self.phase_timings}")
+
+        if warm_up:
+            self._warmup_task = asyncio.create_task(self._warm_up())
+
+    async def _warm_up(self):
+        """Import the heavy libraries off the event loop so the first request doesn't pay for them"""
+        for module in HEAVY_MODULES:
+            try:
+                with self.phase(f"import:{module}"):
+                    await asyncio.to_thread(importlib.import_module, module)
+            except Exception as e:
+                logger.error(f"Failed to import {module} during warm-up: {str(e)}")
+        logger.info(f"Warm-up finished, startup phases (ms): {self.phase_timings}")
+
+    async def stop(self):
+        if self._warmup_task and not self._warmup_task.done():
+            self._warmup_task.cancel()
+        if self.quote_hub is not None:
+            await self.quote_hub.stop()
+        if self.cache is not None:
+            await self.cache.close()
+        self.ready = False
+
+    def startup_report(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "warmed_up": bool(self._warmup_task and self._warmup_task.done()),
+            "phases_ms": dict(self.phase_timings),
+        }
@@ -1,25 +1,11 @@
-import groq
 from src.config import Config
+from src.data.cache import CacheBackend, NullCache
 import asyncio
+import hashlib
 import json
 import re
 
-class LLMService:
-    def __init__(self):
-        self.client = groq.Groq(
-            api_key=Config.GROQ_API_KEY
-        )
-
-    async def process_query(self, query: str):
-        if "Analyze this stock data" in query:
-            # This is a stock analysis request
-            completion = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model="mixtral-8x7b-32768",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """You are a stock market expert. Analyze the given stock data and provide insights.
+ANALYSIS_PROMPT = """You are a stock market expert. Analyze the given stock data and provide insights.
                         Return a JSON object with these exact fields:
                         {
                             "performance_summary": "brief analysis of performance",
@@ -33,19 +19,8 @@ class LLMService:
                                 "volatility": "high|normal|low"
                             }
                         }"""
-                    },
-                    {"role": "user", "content": query}
-                ]
-            )
-        else:
-            # This is a search criteria request
-            completion = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model="mixtral-8x7b-32768",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": """Extract search criteria from the query.
+
+SEARCH_CRITERIA_PROMPT = """Extract search criteria from the query.
                         Return a JSON object with these exact fields:
                         {
                             "sectors": ["list of sectors"],
@@ -55,13 +30,57 @@ class LLMService:
                             "keywords": ["key terms"],
                             "description": "human readable interpretation"
                         }"""
-                    },
-                    {"role": "user", "content": query}
-                ]
+
+class LLMService:
+    def __init__(self, cache: CacheBackend = None):
+        self._client = None
+        self.cache = cache or NullCache()
+
+    @property
+    def client(self):
+        """Groq client, created on first use so startup doesn't import groq"""
+        if self._client is None:
+            import groq
+            self._client = groq.Groq(
+                api_key=Config.GROQ_API_KEY
             )
+        return self._client
+
+    async def process_query(self, query: str):
+        if "Analyze this stock data" in query:
+            # This is a stock analysis request. The prompt embeds the quote, so
+            # identical prompts can share one analysis across all workers.
+            failed = {}
+
+            async def fetch_analysis():
+                result = await self._complete(ANALYSIS_PROMPT, query)
+                if "error" in result:
+                    failed["result"] = result
+                    return None
+                return result
+
+            key = "analysis:" + hashlib.sha256(query.encode()).hexdigest()
+            analysis = await self.cache.get_or_fetch(key, Config.ANALYSIS_CACHE_TTL, fetch_analysis)
+            return analysis if analysis is not None else failed["result"]
+
+        # This is a search criteria request
+        return await self._complete(SEARCH_CRITERIA_PROMPT, query)
+
+    async def _complete(self, system_prompt: str, query: str):
+        completion = await asyncio.to_thread(
+            self.client.chat.completions.create,
+            model="mixtral-8x7b-32768",
+            messages=[
+                {
+                    "role": "system",
+                    "content": system_prompt
+                },
+                {"role": "user", "content": query}
+            ]
+        )
 
         response = completion.choices[0].message.content.strip()
-        
+
         try:
             # Try to parse as JSON directly
             return json.loads(response)
@@ -73,7 +92,7 @@ class LLMService:
                     return json.loads(matches[0])
                 except:
                     pass
-            
+
             # If all parsing fails, return error response
             return {
                 "error": "Failed to parse LLM response",
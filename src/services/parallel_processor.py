@@ -3,18 +3,25 @@
 import asyncio
 from typing import List, Dict, Any
 from src.data.stock_client import StockClient
-from src.data.database import Database
 import logging
 from datetime import datetime
 
 class ParallelStockProcessor:
-    def __init__(self, max_workers: int = 5):
+    def __init__(self, max_workers: int = 5, stock_client: StockClient = None, database=None):
         self.max_workers = max_workers
-        self.stock_client = StockClient()
-        self.database = Database()
+        self.stock_client = stock_client or StockClient()
+        self._database = database
         self.processing_semaphore = asyncio.Semaphore(max_workers)
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def database(self):
+        """Database connection, opened (and its tables created) on first write"""
+        if self._database is None:
+            from src.data.database import Database
+            self._database = Database()
+        return self._database
+
     async def process_stock(self, symbol: str) -> Dict[str, Any]:
         """Process a single stock with error handling and retries"""
         async with self.processing_semaphore:  # Limit concurrent processing
@@ -44,4 +51,22 @@ class ParallelStockProcessor:
                 continue
             processed_results.append(result)
             
-        return processed_results
\ No newline at end of file
+        return processed_results
+
+    async def process_with_progress(self, symbols: List[str], batch_size: int = 10) -> Dict[str, Any]:
+        """Process symbols in batches of batch_size, logging progress after each batch"""
+        batch_size = max(1, batch_size or 1)
+        results = []
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            results.extend(await self.process_batch(batch))
+            self.logger.info(f"Processed {min(start + batch_size, len(symbols))}/{len(symbols)} stocks")
+
+        failed = [r["symbol"] for r in results if "error" in r]
+        return {
+            "total": len(symbols),
+            "processed": len(results) - len(failed),
+            "failed": failed,
+            "completed_at": datetime.now().isoformat(),
+            "results": results,
+        }
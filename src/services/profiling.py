@@ -0,0 +1,134 @@
+# src/services/profiling.py
+#
+# Opt-in per-request profiling. The middleware is only added to the app when
+# profiling is configured, so requests pay nothing for it otherwise.
+
+import asyncio
+import hmac
+import logging
+import os
+import random
+import re
+import time
+import uuid
+from typing import Optional
+from urllib.parse import parse_qs
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_ROUTE = "/profiles/"
+RENDERERS = {"speedscope": "speedscope.json", "html": "html"}
+
+def profiling_enabled() -> bool:
+    return bool(Config.PROFILE_TOKEN) or Config.PROFILE_SAMPLE_RATE > 0
+
+class ProfilingMiddleware:
+    """Run pyinstrument around selected requests and save one profile per request.
+
+    A request is profiled when it carries the profile token in the X-Profile
+    header or ?profile= query parameter, or when it is picked by sampling. The
+    response gets an X-Profile-Id header and the file is written to PROFILE_DIR.
+    When a token is configured the response also gets X-Profile-Url, and the
+    file can be downloaded from /profiles/<id> with the token. Without a token
+    sampled profiles can only be read from PROFILE_DIR.
+    """
+
+    def __init__(self, app, output_dir: str = None, token: str = None, sample_rate: float = None,
+                 renderer: str = None, interval: float = None):
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("Request profiling requires the 'pyinstrument' package") from e
+        self.profiler_class = Profiler
+        self.app = app
+        self.output_dir = output_dir or Config.PROFILE_DIR
+        self.token = token if token is not None else Config.PROFILE_TOKEN
+        self.sample_rate = sample_rate if sample_rate is not None else Config.PROFILE_SAMPLE_RATE
+        self.renderer = renderer or Config.PROFILE_FORMAT
+        self.interval = interval or Config.PROFILE_INTERVAL
+        if self.renderer not in RENDERERS:
+            raise ValueError(f"Unknown profile format: {self.renderer}")
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _request_token(self, scope) -> Optional[str]:
+        for name, value in scope.get("headers", []):
+            if name.decode("latin-1").lower() == PROFILE_HEADER:
+                return value.decode("latin-1")
+        values = parse_qs(scope.get("query_string", b"").decode("latin-1")).get(PROFILE_QUERY_PARAM)
+        return values[0] if values else None
+
+    def _authorized(self, scope) -> bool:
+        supplied = self._request_token(scope)
+        # Compare bytes: compare_digest rejects str arguments with non-ASCII characters
+        return bool(self.token and supplied and hmac.compare_digest(supplied.encode(), self.token.encode()))
+
+    def should_profile(self, scope) -> bool:
+        if self._authorized(scope):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["path"].startswith(PROFILE_ROUTE):
+            return await self._serve_profile(scope, receive, send)
+        if not self.should_profile(scope):
+            return await self.app(scope, receive, send)
+
+        slug = re.sub(r"[^a-zA-Z0-9]+", "-", scope["path"]).strip("-") or "root"
+        profile_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{slug}-{uuid.uuid4().hex[:8]}.{RENDERERS[self.renderer]}"
+
+        async def send_with_pointer(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                if self.token:
+                    headers.append((b"x-profile-url", f"{PROFILE_ROUTE}{profile_id}".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        profiler = self.profiler_class(interval=self.interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_pointer)
+        finally:
+            profiler.stop()
+            try:
+                await asyncio.to_thread(self._write, profiler, profile_id)
+                logger.info(f"Saved profile for {scope['method']} {scope['path']} to {profile_id}")
+            except Exception as e:
+                logger.error(f"Failed to save profile {profile_id}: {str(e)}")
+
+    def _write(self, profiler, profile_id: str):
+        from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+
+        renderer = SpeedscopeRenderer() if self.renderer == "speedscope" else HTMLRenderer()
+        with open(os.path.join(self.output_dir, profile_id), "w") as f:
+            f.write(profiler.output(renderer))
+
+    async def _serve_profile(self, scope, receive, send):
+        from starlette.responses import FileResponse, JSONResponse
+
+        profile_id = os.path.basename(scope["path"][len(PROFILE_ROUTE):])
+        path = os.path.join(self.output_dir, profile_id)
+        if not self._authorized(scope):
+            response = JSONResponse({"detail": "Profile token required"}, status_code=403)
+        elif not profile_id or not os.path.isfile(path):
+            response = JSONResponse({"detail": "Profile not found"}, status_code=404)
+        else:
+            response = FileResponse(path)
+        await response(scope, receive, send)
+
+def install_profiling(app) -> bool:
+    """Add ProfilingMiddleware to app if profiling is configured"""
+    if not profiling_enabled():
+        return False
+    app.add_middleware(ProfilingMiddleware)
+    logger.info(
+        f"Request profiling enabled (token: {'set' if Config.PROFILE_TOKEN else 'unset'}, "
+        f"sample rate: {Config.PROFILE_SAMPLE_RATE}, output: {Config.PROFILE_DIR})"
+    )
+    return True
@@ -1,8 +1,14 @@
 # src/services/query_processor.py
 
+from src.config import Config
 from src.services.llm_service import LLMService
 from src.data.stock_client import StockClient
-from typing import Dict, List, Any, Optional
+from src.services.symbol_index import SymbolIndex
+from src.services.sector_aggregates import SectorAggregates
+from src.services.search_cache import SearchCache
+from src.logging_setup import LazyPayload, timed_stage
+from typing import Dict, List, Any, Optional, Tuple
+import base64
 import json
 import logging
 logger = logging.getLogger(__name__)
@@ -15,6 +21,9 @@ class StockInfo:
         self.industry = industry
         self.name = name
 
+class InvalidCursorError(ValueError):
+    """A paging cursor that is malformed or was issued for different criteria"""
+
 class QueryProcessor:
     def __init__(self, llm_service: LLMService, stock_client: StockClient):
         self.llm_service = llm_service
@@ -52,27 +61,50 @@ class QueryProcessor:
             "GS": StockInfo("GS", "Finance", "Investment Banking", "Goldman Sachs Group")
         }
 
-    async def process_query(self, query: str, include_historical: bool = True, days: int = 365) -> Dict[str, Any]:
-        """Process natural language query and return relevant stock information."""
+        # Ticker/company-name lookup so "nvidia" or "appl" skip the LLM parse
+        self.symbol_index = SymbolIndex(self.stock_universe)
+
+        # Sector/industry statistics kept current by every quote the client returns
+        self.sector_aggregates = SectorAggregates(self.stock_universe)
+
+        # Finished search responses, dropped when a newer price is seen for a stock in them
+        self.search_cache = SearchCache()
+        if stock_client is not None:
+            stock_client.add_quote_listener(self.sector_aggregates.on_quote)
+            stock_client.add_quote_listener(self.search_cache.on_quote)
+
+    async def process_query(self, query: str, include_historical: bool = True, days: int = 365,
+                            limit: int = 10, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Process natural language query and return relevant stock information.
+
+        Search results come back limit at a time, best market cap first; pass the
+        returned next_cursor to get the following page. results_count is the
+        total number of matches, not the size of the page. Every response has a
+        next_cursor key; it is always None for single-stock and sector/industry
+        answers, which aren't paged and reject a cursor with InvalidCursorError.
+        """
         try:
             logger.info(f"Processing query: {query}")
             logger.debug(f"Historical data params - include: {include_historical}, days: {days}")
 
-            # Handle direct stock symbol queries
-            query_upper = query.strip().upper()
-            if query_upper in self.stock_universe:
-                stock_data = await self.stock_client.get_stock_details(
-                    query_upper,
-                    include_historical=include_historical,
-                    days=days
-                )
-                logger.debug(f"Raw stock data from client: {stock_data.get('historical_data', 'No historical data')}")
+            # Handle direct stock symbol and company name queries
+            symbol = self.symbol_index.resolve(query)
+            if symbol:
+                if cursor:
+                    raise InvalidCursorError("Cursor does not belong to this query")
+                with timed_stage("fetch_quotes"):
+                    stock_data = await self.stock_client.get_stock_details(
+                        symbol,
+                        include_historical=include_historical,
+                        days=days
+                    )
+                logger.debug("Raw stock data from client: %s", LazyPayload(stock_data.get('historical_data', 'No historical data')))
                 
                 if "error" not in stock_data:
-                    stock_info = self.stock_universe[query_upper]
+                    stock_info = self.stock_universe[symbol]
                     # Preserve historical data before updating other fields
                     historical_data = stock_data.get("historical_data")
-                    logger.debug(f"Historical data before update: {historical_data}")
+                    logger.debug("Historical data before update: %s", LazyPayload(historical_data))
                     
                     stock_data.update({
                         "name": stock_info.name,
@@ -83,24 +115,48 @@ class QueryProcessor:
                     # Restore historical data after update
                     if historical_data:
                         stock_data["historical_data"] = historical_data
-                        logger.debug(f"Historical data after update: {stock_data['historical_data']}")
+                        logger.debug("Historical data after update: %s", LazyPayload(stock_data['historical_data']))
                     
-                    analyzed_stock = await self._analyze_stock(stock_data)
-                    logger.debug(f"Final historical data: {analyzed_stock.get('historical_data', 'No historical data')}")
+                    with timed_stage("analysis"):
+                        analyzed_stock = await self._analyze_stock(stock_data)
+                    logger.debug("Final historical data: %s", LazyPayload(analyzed_stock.get('historical_data', 'No historical data')))
                     
                     return {
                         "query": query,
-                        "interpreted_as": f"Detailed analysis of {query_upper}",
+                        "interpreted_as": f"Detailed analysis of {symbol}",
                         "results_count": 1,
                         "results": [analyzed_stock],
+                        "next_cursor": None,
                     }
 
+            # Questions about a whole sector or industry ("how is Energy doing")
+            # are answered from the running aggregates once they have data
+            group_response = await self._answer_group_query(query, top=limit)
+            if group_response:
+                if cursor:
+                    raise InvalidCursorError("Cursor does not belong to this query")
+                return group_response
+
             # Parse the query into structured data
-            parsed_query = await self._parse_query(query)
-            logger.debug(f"Parsed query: {parsed_query}")
+            with timed_stage("parse"):
+                parsed_query = await self._parse_query(query)
+            logger.debug("Parsed query: %s", LazyPayload(parsed_query))
+
+            cache_key = self.search_cache.make_key(
+                parsed_query, include_historical=include_historical, days=days, limit=limit, cursor=cursor
+            )
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Query answered from the search result cache")
+                return dict(cached, query=query)
 
-            # Fetch stock data from static and live sources
-            results = await self._fetch_stock_data(include_historical=include_historical, days=days)
+            criteria_id = self.search_cache.make_key(parsed_query)[:16]
+            after = self._decode_cursor(cursor, criteria_id) if cursor else None
+
+            # Rank every candidate on quote data alone; history and analysis
+            # are only fetched for the page that is returned
+            with timed_stage("fetch_quotes"):
+                results = await self._fetch_stock_data(include_historical=False)
 
             if not results:
                 logger.warning("No stock data available at the moment.")
@@ -108,40 +164,82 @@ class QueryProcessor:
                     "query": query,
                     "error": "No stock data available",
                     "results": [],
+                    "next_cursor": None,
                 }
 
             # Apply filters to the fetched data
-            filtered_results = self._apply_filters(results, parsed_query)
+            with timed_stage("filter"):
+                filtered_results = self._apply_filters(results, parsed_query)
+                ranked = self._sort_results(filtered_results, parsed_query)
+                if after is not None:
+                    ranked_after = [s for s in ranked if self._rank_key(s, parsed_query) > after]
+                else:
+                    ranked_after = ranked
+                page = ranked_after[:limit]
 
-            # Apply analysis to filtered results
+            # Apply analysis to the requested page only
             analyzed_results = []
-            for stock in filtered_results:
-                # Preserve historical data before analysis
-                historical_data = stock.get("historical_data")
-                logger.debug(f"Historical data before analysis for {stock['symbol']}: {historical_data}")
-                
-                analyzed_stock = await self._analyze_stock(stock)
-                
-                # Restore historical data after analysis
-                if historical_data:
-                    analyzed_stock["historical_data"] = historical_data
-                    logger.debug(f"Historical data after analysis for {stock['symbol']}: {analyzed_stock['historical_data']}")
-                
-                analyzed_results.append(analyzed_stock)
+            for stock in page:
+                if include_historical:
+                    with timed_stage("history"):
+                        historical_data = await self.stock_client.get_historical_data(stock["symbol"], days)
+                    if historical_data:
+                        stock["historical_data"] = historical_data
+                with timed_stage("analysis"):
+                    analyzed_results.append(await self._analyze_stock(stock))
+
+            next_cursor = None
+            if len(ranked_after) > len(page) and page:
+                next_cursor = self._encode_cursor(self._rank_key(page[-1], parsed_query), criteria_id)
 
             response = {
                 "query": query,
                 "interpreted_as": parsed_query.get("description", ""),
-                "results_count": len(analyzed_results),
-                "results": analyzed_results[:10],  # Limit to top 10 results
+                "results_count": len(ranked),
+                "results": analyzed_results,
+                "next_cursor": next_cursor,
             }
 
-            logger.info(f"Query processed successfully with {len(analyzed_results)} results.")
+            logger.info(f"Query processed successfully with {len(analyzed_results)} of {len(ranked)} results.")
+            self.search_cache.set(cache_key, response, matched=ranked)
             return response
 
+        except InvalidCursorError:
+            raise
         except Exception as e:
             logger.error(f"Error processing query: {str(e)}", exc_info=True)
-            return {"error": str(e), "query": query, "results": []}
+            return {"error": str(e), "query": query, "results": [], "next_cursor": None}
+
+    async def _answer_group_query(self, query: str, top: int = 5) -> Optional[Dict[str, Any]]:
+        """Aggregate response for a sector/industry query.
+
+        Members without a quote younger than QUOTE_CACHE_TTL are fetched first;
+        None if it isn't a group query or too few members have fresh quotes.
+        """
+        match = self.sector_aggregates.match_query(query)
+        if match is None:
+            return None
+        group, losers = match
+        self.sector_aggregates.expire()
+        missing = group.unreported()
+        if missing and self.stock_client is not None:
+            with timed_stage("fetch_quotes"):
+                await self.stock_client.get_quotes(sorted(missing), fields=list(self.sector_aggregates.MEMBER_FIELDS))
+        coverage = group.change_count / len(group.symbols)
+        if coverage < Config.GROUP_QUERY_MIN_COVERAGE:
+            logger.debug(f"Only {coverage:.0%} of {group.group_type} {group.name} has fresh quotes, using full search")
+            return None
+
+        summary = group.snapshot(top)
+        movers = summary["top_losers"] if losers else summary["top_gainers"]
+        return {
+            "query": query,
+            "interpreted_as": f"Aggregate performance of the {group.name} {group.group_type}",
+            "aggregate": summary,
+            "results_count": len(movers),
+            "results": movers,
+            "next_cursor": None,
+        }
 
     async def _fetch_stock_data(self, include_historical: bool = True, days: int = 365) -> List[Dict[str, Any]]:
         """Fetch live stock data and merge with static information"""
@@ -153,12 +251,12 @@ class QueryProcessor:
                 include_historical=include_historical,
                 days=days
             )
-            logger.debug(f"Raw stock data for {symbol}: {stock_data.get('historical_data', 'No historical data')}")
+            logger.debug("Raw stock data for %s: %s", symbol, LazyPayload(stock_data.get('historical_data', 'No historical data')))
             
             if "error" not in stock_data:
                 # Preserve historical data before merging static info
                 historical_data = stock_data.get("historical_data")
-                logger.debug(f"Historical data before merge for {symbol}: {historical_data}")
+                logger.debug("Historical data before merge for %s: %s", symbol, LazyPayload(historical_data))
                 
                 # Merge static info with live data
                 stock_data.update({
@@ -170,7 +268,7 @@ class QueryProcessor:
                 # Restore historical data after merge
                 if historical_data:
                     stock_data["historical_data"] = historical_data
-                    logger.debug(f"Historical data after merge for {symbol}: {stock_data['historical_data']}")
+                    logger.debug("Historical data after merge for %s: %s", symbol, LazyPayload(stock_data['historical_data']))
                 
                 results.append(stock_data)
         
@@ -181,7 +279,7 @@ class QueryProcessor:
         try:
             # Preserve historical data before analysis
             historical_data = stock_data.get("historical_data")
-            logger.debug(f"Historical data before analysis for {stock_data['symbol']}: {historical_data}")
+            logger.debug("Historical data before analysis for %s: %s", stock_data['symbol'], LazyPayload(historical_data))
             
             prompt = (
                 f"Analyze this stock data and provide key insights:\n"
@@ -200,7 +298,7 @@ class QueryProcessor:
             response = await self.llm_service.process_query(prompt)
 
             # Log and validate response
-            logger.debug(f"AI Response for {stock_data['symbol']}: {response}")
+            logger.debug("AI Response for %s: %s", stock_data['symbol'], LazyPayload(response))
 
             if isinstance(response, str):
                 response = json.loads(response)
@@ -226,7 +324,7 @@ class QueryProcessor:
             # Restore historical data after analysis
             if historical_data:
                 stock_data["historical_data"] = historical_data
-                logger.debug(f"Historical data after analysis for {stock_data['symbol']}: {stock_data['historical_data']}")
+                logger.debug("Historical data after analysis for %s: %s", stock_data['symbol'], LazyPayload(stock_data['historical_data']))
                 
             return stock_data
 
@@ -247,15 +345,19 @@ class QueryProcessor:
             # Ensure historical data is preserved even on analysis failure
             if historical_data:
                 stock_data["historical_data"] = historical_data
-                logger.debug(f"Historical data preserved after analysis failure for {stock_data['symbol']}: {stock_data['historical_data']}")
+                logger.debug("Historical data preserved after analysis failure for %s: %s", stock_data['symbol'], LazyPayload(stock_data['historical_data']))
             return stock_data
 
     async def _parse_query(self, query: str) -> Dict[str, Any]:
         """Parse natural language query into structured format."""
+        memoized = self.search_cache.get_parsed(query)
+        if memoized is not None:
+            return memoized
+
         try:
             # Get structured data from LLM
             response = await self.llm_service.process_query(query)
-            logger.debug(f"LLM parsed response: {response}")
+            logger.debug("LLM parsed response: %s", LazyPayload(response))
 
             # Check for error in response
             if "error" in response:
@@ -270,8 +372,8 @@ class QueryProcessor:
             if isinstance(industries, str):
                 industries = [industries]
 
-            # Return structured format
-            return {
+            # Return structured format; only successful LLM parses are memoized
+            parsed = {
                 "sectors": sectors,
                 "industries": industries,
                 "market_cap_min": response.get("market_cap_min"),
@@ -279,6 +381,8 @@ class QueryProcessor:
                 "keywords": response.get("keywords", []),
                 "description": response.get("description", "No description available")
             }
+            self.search_cache.set_parsed(query, parsed)
+            return parsed
 
         except Exception as e:
             logger.warning(f"LLM parsing failed, using basic parsing: {str(e)}")
@@ -360,17 +464,31 @@ class QueryProcessor:
         
         return filtered
 
-    def _sort_results(self, stocks: List[Dict], criteria: Dict) -> List[Dict]:
-        """Sort results based on specified criteria"""
+    def _rank_key(self, stock: Dict, criteria: Dict) -> Tuple[float, str]:
+        """Position of stock in the result order; ties are broken by symbol"""
         sort_by = criteria.get("sort_by", "market_cap")
         sort_order = criteria.get("sort_order", "desc")
-        
-        def get_sort_value(stock: Dict) -> float:
-            value = stock.get(sort_by, 0)
-            return float(value if value is not None else 0)
-        
-        return sorted(
-            stocks,
-            key=get_sort_value,
-            reverse=sort_order.lower() == "desc"
-        )
+        value = stock.get(sort_by, 0)
+        value = float(value if value is not None else 0)
+        return (-value if sort_order.lower() == "desc" else value, stock.get("symbol", ""))
+
+    def _sort_results(self, stocks: List[Dict], criteria: Dict) -> List[Dict]:
+        """Sort results based on specified criteria"""
+        return sorted(stocks, key=lambda stock: self._rank_key(stock, criteria))
+
+    def _encode_cursor(self, rank_key: Tuple[float, str], criteria_id: str) -> str:
+        """Opaque cursor: the last returned position plus the criteria it belongs to"""
+        payload = json.dumps({"after": list(rank_key), "criteria": criteria_id})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor: str, criteria_id: str) -> Tuple[float, str]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            value, symbol = payload["after"]
+            position = (float(value), str(symbol))
+        except Exception:
+            raise InvalidCursorError("Invalid cursor")
+        if payload.get("criteria") != criteria_id:
+            raise InvalidCursorError("Cursor does not belong to this query")
+        return position
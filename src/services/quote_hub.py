@@ -0,0 +1,161 @@
+# src/services/quote_hub.py
+
+import asyncio
+import logging
+from typing import Dict, List, Any, Optional, Set
+from src.config import Config
+from src.data.stock_client import StockClient, PRICE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Quote fields pushed to subscribers; only the ones that changed are sent
+TRACKED_FIELDS = tuple(sorted(PRICE_FIELDS))
+
+class Subscription:
+    """One connected client: the symbols it watches and its bounded outbox"""
+
+    def __init__(self, max_queue: int):
+        self.symbols: Set[str] = set()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.dropped = False
+
+class QuoteHub:
+    """Polls each watched symbol once per interval and fans deltas out to subscribers.
+
+    Upstream work depends on the number of distinct symbols being watched, not
+    on the number of connected clients. A client that can't keep up with its
+    outbox is disconnected rather than buffered without limit.
+    """
+
+    def __init__(self, stock_client: StockClient, poll_interval: float = None, max_queue: int = None):
+        self.stock_client = stock_client
+        self.poll_interval = poll_interval or Config.QUOTE_HUB_POLL_INTERVAL
+        self.max_queue = max_queue or Config.QUOTE_HUB_MAX_QUEUE
+        self.subscriptions: Set[Subscription] = set()
+        self.watchers: Dict[str, Set[Subscription]] = {}
+        self.last_quotes: Dict[str, Dict[str, Any]] = {}
+        self.fetch_semaphore = asyncio.Semaphore(Config.QUOTE_HUB_FETCH_CONCURRENCY)
+        self._task: Optional[asyncio.Task] = None
+
+    def connect(self) -> Subscription:
+        subscription = Subscription(self.max_queue)
+        self.subscriptions.add(subscription)
+        return subscription
+
+    def disconnect(self, subscription: Subscription):
+        self.unsubscribe(subscription, list(subscription.symbols))
+        self.subscriptions.discard(subscription)
+
+    def subscribe(self, subscription: Subscription, symbols: List[str]) -> List[str]:
+        """Watch symbols, sending the latest known quote for each right away"""
+        added = []
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            if not symbol or symbol in subscription.symbols:
+                continue
+            if len(subscription.symbols) >= Config.QUOTE_HUB_MAX_SYMBOLS:
+                self.send(subscription, {
+                    "type": "error",
+                    "error": f"At most {Config.QUOTE_HUB_MAX_SYMBOLS} symbols per connection"
+                })
+                break
+            subscription.symbols.add(symbol)
+            self.watchers.setdefault(symbol, set()).add(subscription)
+            added.append(symbol)
+
+            last_quote = self.last_quotes.get(symbol)
+            if last_quote:
+                self.send(subscription, self._message(symbol, last_quote))
+        return added
+
+    def unsubscribe(self, subscription: Subscription, symbols: List[str]):
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            subscription.symbols.discard(symbol)
+            watchers = self.watchers.get(symbol)
+            if watchers is None:
+                continue
+            watchers.discard(subscription)
+            if not watchers:
+                del self.watchers[symbol]
+                self.last_quotes.pop(symbol, None)
+
+    def send(self, subscription: Subscription, message: Dict[str, Any]):
+        """Queue a message for a subscriber, dropping the subscriber if its outbox is full"""
+        if subscription.dropped:
+            return
+        try:
+            subscription.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            logger.warning(f"Dropping slow quote subscriber watching {sorted(subscription.symbols)}")
+            subscription.dropped = True
+            self.disconnect(subscription)
+            # Replace the backlog with a single close marker for the sender
+            while not subscription.queue.empty():
+                subscription.queue.get_nowait()
+            subscription.queue.put_nowait(None)
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Quote hub poll failed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _fetch(self, symbol: str) -> Optional[Dict[str, Any]]:
+        async with self.fetch_semaphore:
+            try:
+                return await self.stock_client.get_price(symbol, max_age=self.poll_interval)
+            except Exception as e:
+                logger.error(f"Quote hub failed to fetch {symbol}: {str(e)}")
+                return None
+
+    async def poll_once(self):
+        """Fetch every watched symbol once and publish whatever changed"""
+        symbols = list(self.watchers)
+        if not symbols:
+            return
+        quotes = await asyncio.gather(*[self._fetch(symbol) for symbol in symbols])
+
+        for symbol, quote in zip(symbols, quotes):
+            if quote is None or symbol not in self.watchers:
+                continue
+            previous = self.last_quotes.get(symbol, {})
+            changes = {
+                field: quote.get(field) for field in TRACKED_FIELDS
+                if quote.get(field) != previous.get(field)
+            }
+            self.last_quotes[symbol] = quote
+            if not changes:
+                continue
+            message = {"type": "quote", "symbol": symbol, "changes": changes}
+            for subscription in list(self.watchers.get(symbol, ())):
+                self.send(subscription, message)
+
+    def _message(self, symbol: str, quote: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "type": "quote",
+            "symbol": symbol,
+            "changes": {field: quote.get(field) for field in TRACKED_FIELDS},
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self.subscriptions),
+            "symbols": len(self.watchers),
+            "poll_interval": self.poll_interval,
+        }
@@ -0,0 +1,153 @@
+# src/services/search_cache.py
+
+import hashlib
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Set
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Quote fields that decide whether a stock matches and where it ranks
+FINGERPRINT_FIELDS = ("current_price", "market_cap")
+
+class SearchCache:
+    """Process-local memo of parsed queries and finished /search responses.
+
+    Responses are keyed on the parsed criteria rather than the query text, so
+    differently worded queries with the same meaning share an entry. Each entry
+    remembers the price and market cap of every stock that matched the query,
+    not just the returned page, since either can change the ranking. It is
+    dropped as soon as a different value for one of them is seen (via the
+    StockClient quote listener), or after max_age seconds at the latest.
+    """
+
+    def __init__(self, max_entries: int = None, max_age: float = None,
+                 parse_memo_size: int = None, parse_memo_ttl: float = None):
+        self.max_entries = max_entries or Config.SEARCH_CACHE_MAX_ENTRIES
+        self.max_age = max_age or Config.SEARCH_CACHE_MAX_AGE
+        self.parse_memo_size = parse_memo_size or Config.SEARCH_PARSE_MEMO_SIZE
+        self.parse_memo_ttl = parse_memo_ttl or Config.SEARCH_PARSE_MEMO_TTL
+        self.entries: OrderedDict = OrderedDict()
+        self.dependents: Dict[str, Set[str]] = {}
+        self.parse_memo: OrderedDict = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.expirations = 0
+        self.parse_hits = 0
+        self.parse_misses = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(re.sub(r"[^a-z0-9&.$ ]+", " ", query.lower()).split())
+
+    @staticmethod
+    def make_key(criteria: Dict[str, Any], **params) -> str:
+        """Stable key for criteria plus request parameters; the description is ignored"""
+        canonical = {}
+        for field, value in criteria.items():
+            if field == "description" or value in (None, [], ""):
+                continue
+            if isinstance(value, list):
+                value = sorted({str(v).lower() for v in value})
+            canonical[field] = value
+        payload = json.dumps({"criteria": canonical, "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_parsed(self, query: str) -> Optional[Dict[str, Any]]:
+        key = self.normalize_query(query)
+        entry = self.parse_memo.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.parse_memo_ttl:
+            self.parse_memo.pop(key, None)
+            self.parse_misses += 1
+            return None
+        self.parse_memo.move_to_end(key)
+        self.parse_hits += 1
+        return entry[1]
+
+    def set_parsed(self, query: str, criteria: Dict[str, Any]):
+        key = self.normalize_query(query)
+        self.parse_memo[key] = (time.monotonic(), criteria)
+        self.parse_memo.move_to_end(key)
+        while len(self.parse_memo) > self.parse_memo_size:
+            self.parse_memo.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is not None and time.monotonic() - entry["created_at"] > self.max_age:
+            self._evict(key)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry["response"]
+
+    def set(self, key: str, response: Dict[str, Any], matched: List[Dict[str, Any]] = None):
+        """Store response, fingerprinting the matched stocks (defaults to its results)"""
+        self._evict(key)
+        if matched is None:
+            matched = response.get("results", [])
+        fingerprints = {
+            stock["symbol"]: {field: stock.get(field) for field in FINGERPRINT_FIELDS}
+            for stock in matched if "symbol" in stock
+        }
+        size = len(json.dumps(response, default=str))
+        self.entries[key] = {
+            "response": response,
+            "fingerprints": fingerprints,
+            "created_at": time.monotonic(),
+            "size": size,
+        }
+        self.bytes += size
+        for symbol in fingerprints:
+            self.dependents.setdefault(symbol, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        self.bytes -= entry["size"]
+        for symbol in entry["fingerprints"]:
+            keys = self.dependents.get(symbol)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.dependents[symbol]
+
+    def on_quote(self, symbol: str, data: Dict[str, Any]):
+        """StockClient listener: drop responses built from an older price or market cap of symbol"""
+        seen = {field: data[field] for field in FINGERPRINT_FIELDS if field in data}
+        if not seen:
+            return
+        for key in list(self.dependents.get(symbol, ())):
+            fingerprint = self.entries[key]["fingerprints"][symbol]
+            changed = [field for field, value in seen.items() if fingerprint[field] != value]
+            if changed:
+                self._evict(key)
+                self.invalidations += 1
+                logger.debug(f"Search cache entry invalidated by new {symbol} {', '.join(changed)}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        parse_lookups = self.parse_hits + self.parse_misses
+        return {
+            "entries": len(self.entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "expirations": self.expirations,
+            "parse_memo_entries": len(self.parse_memo),
+            "parse_hit_ratio": round(self.parse_hits / parse_lookups, 4) if parse_lookups else 0.0,
+        }
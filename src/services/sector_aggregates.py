@@ -0,0 +1,272 @@
+# src/services/sector_aggregates.py
+
+import heapq
+import logging
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Any, Optional, Set, Tuple
+from src.config import Config
+
+logger = logging.getLogger(__name__)
+
+GROUP_TYPES = ("sector", "industry")
+
+# Words that make a query about how a group is doing rather than a stock list;
+# "how ... doing" counts too, but not list words like "top" or "today"
+GROUP_INTENT_WORDS = {
+    "performing", "performance", "gainers", "losers", "movers", "advancers", "decliners",
+}
+LOSER_WORDS = {"losers", "decliners", "worst", "down"}
+
+def _stems(text: str) -> List[str]:
+    words = re.sub(r"[^a-z0-9]+", " ", text.lower()).split()
+    return [w[:-1] if len(w) > 3 and w.endswith("s") else w for w in words if w != "and"]
+
+class RunningMedian:
+    """Median of a multiset supporting O(log n) add/remove (two heaps, lazy deletion)"""
+
+    def __init__(self):
+        self.low: List[float] = []    # max-heap via negation
+        self.high: List[float] = []   # min-heap
+        self.low_size = 0
+        self.high_size = 0
+        self.delayed: Counter = Counter()
+
+    def __len__(self):
+        return self.low_size + self.high_size
+
+    def add(self, value: float):
+        if not self.low or value <= -self.low[0]:
+            heapq.heappush(self.low, -value)
+            self.low_size += 1
+        else:
+            heapq.heappush(self.high, value)
+            self.high_size += 1
+        self._rebalance()
+
+    def remove(self, value: float):
+        self.delayed[value] += 1
+        if self.low and value <= -self.low[0]:
+            self.low_size -= 1
+            if value == -self.low[0]:
+                self._prune(self.low, -1)
+        else:
+            self.high_size -= 1
+            if self.high and value == self.high[0]:
+                self._prune(self.high, 1)
+        self._rebalance()
+
+    def median(self) -> Optional[float]:
+        if not len(self):
+            return None
+        if self.low_size > self.high_size:
+            return -self.low[0]
+        return (-self.low[0] + self.high[0]) / 2
+
+    def _prune(self, heap: List[float], sign: int):
+        while heap and self.delayed[sign * heap[0]] > 0:
+            value = sign * heapq.heappop(heap)
+            self.delayed[value] -= 1
+            if not self.delayed[value]:
+                del self.delayed[value]
+
+    def _rebalance(self):
+        if self.low_size > self.high_size + 1:
+            heapq.heappush(self.high, -heapq.heappop(self.low))
+            self.low_size -= 1
+            self.high_size += 1
+            self._prune(self.low, -1)
+        elif self.low_size < self.high_size:
+            heapq.heappush(self.low, -heapq.heappop(self.high))
+            self.high_size -= 1
+            self.low_size += 1
+            self._prune(self.high, 1)
+
+class GroupAggregate:
+    """Running statistics for one sector or industry, updated one quote at a time"""
+
+    def __init__(self, group_type: str, name: str, symbols: List[str]):
+        self.group_type = group_type
+        self.name = name
+        self.symbols = set(symbols)
+        self.members: Dict[str, Dict[str, Any]] = {}
+        self.change_count = 0
+        self.change_sum = 0.0
+        self.total_market_cap = 0.0
+        self.total_volume = 0
+        self.advancers = 0
+        self.decliners = 0
+        self.median_change = RunningMedian()
+        # (key, version, symbol); entries whose version is stale are skipped
+        self._gainers: List[Tuple[float, int, str]] = []
+        self._losers: List[Tuple[float, int, str]] = []
+        self._version = 0
+
+    def update(self, member: Dict[str, Any]):
+        """Replace a member's contribution with its latest values"""
+        symbol = member["symbol"]
+        previous = self.members.get(symbol)
+        if previous is not None:
+            self._apply(previous, -1)
+        self._version += 1
+        member = dict(member, version=self._version)
+        self.members[symbol] = member
+        self._apply(member, 1)
+
+        change = member.get("daily_change_percent")
+        if change is not None:
+            heapq.heappush(self._gainers, (-change, self._version, symbol))
+            heapq.heappush(self._losers, (change, self._version, symbol))
+            if len(self._gainers) > 2 * len(self.members) + 16:
+                self._compact()
+
+    def remove(self, symbol: str):
+        """Take a member's contribution out, e.g. once its quote is too old"""
+        member = self.members.pop(symbol, None)
+        if member is not None:
+            self._apply(member, -1)
+
+    def unreported(self) -> Set[str]:
+        """Symbols without a daily change in the aggregate"""
+        return {
+            symbol for symbol in self.symbols
+            if self.members.get(symbol, {}).get("daily_change_percent") is None
+        }
+
+    def _apply(self, member: Dict[str, Any], sign: int):
+        change = member.get("daily_change_percent")
+        if change is not None:
+            self.change_count += sign
+            self.change_sum += sign * change
+            if sign > 0:
+                self.median_change.add(change)
+            else:
+                self.median_change.remove(change)
+            if change > 0:
+                self.advancers += sign
+            elif change < 0:
+                self.decliners += sign
+        self.total_market_cap += sign * (member.get("market_cap") or 0)
+        self.total_volume += sign * (member.get("volume") or 0)
+
+    def _is_current(self, version: int, symbol: str) -> bool:
+        member = self.members.get(symbol)
+        return member is not None and member["version"] == version
+
+    def _compact(self):
+        self._gainers = [e for e in self._gainers if self._is_current(e[1], e[2])]
+        self._losers = [e for e in self._losers if self._is_current(e[1], e[2])]
+        heapq.heapify(self._gainers)
+        heapq.heapify(self._losers)
+
+    def top_movers(self, n: int, gainers: bool = True) -> List[Dict[str, Any]]:
+        """Best (or worst) n members by daily change, in O(n log m)"""
+        heap = self._gainers if gainers else self._losers
+        taken = []
+        while heap and len(taken) < n:
+            entry = heapq.heappop(heap)
+            if self._is_current(entry[1], entry[2]):
+                taken.append(entry)
+        for entry in taken:
+            heapq.heappush(heap, entry)
+        return [self._public(self.members[symbol]) for _, _, symbol in taken]
+
+    def _public(self, member: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in member.items() if k != "version"}
+
+    def snapshot(self, top: int = 5) -> Dict[str, Any]:
+        return {
+            "group_type": self.group_type,
+            "name": self.name,
+            "members": len(self.symbols),
+            "reporting": self.change_count,
+            "average_change_percent": round(self.change_sum / self.change_count, 2) if self.change_count else None,
+            "median_change_percent": self._round(self.median_change.median()),
+            "total_market_cap": self.total_market_cap or None,
+            "total_volume": self.total_volume,
+            "advancers": self.advancers,
+            "decliners": self.decliners,
+            "unchanged": self.change_count - self.advancers - self.decliners,
+            "top_gainers": self.top_movers(top, gainers=True),
+            "top_losers": self.top_movers(top, gainers=False),
+        }
+
+    def _round(self, value: Optional[float]) -> Optional[float]:
+        return round(value, 2) if value is not None else None
+
+class SectorAggregates:
+    """Per-sector and per-industry aggregates kept current from incoming quotes.
+
+    Registered as a StockClient quote listener, so each stored quote adjusts the
+    running totals of its two groups instead of triggering a recomputation.
+    Call expire() before reading to drop members whose last quote is older
+    than QUOTE_CACHE_TTL.
+    """
+
+    MEMBER_FIELDS = ("current_price", "daily_change_percent", "market_cap", "volume")
+
+    def __init__(self, stock_universe: Dict[str, Any]):
+        self.stock_universe = stock_universe
+        self.groups: Dict[Tuple[str, str], GroupAggregate] = {}
+        for group_type in GROUP_TYPES:
+            members: Dict[str, List[str]] = {}
+            for symbol, info in stock_universe.items():
+                members.setdefault(getattr(info, group_type), []).append(symbol)
+            for name, symbols in members.items():
+                self.groups[(group_type, name.lower())] = GroupAggregate(group_type, name, symbols)
+
+        # Group names as word stems, most specific first, for matching queries
+        self._group_stems = sorted(
+            ((key, _stems(group.name)) for key, group in self.groups.items()),
+            key=lambda item: (item[0][0] != "industry", -len(item[1]))
+        )
+        self._latest: Dict[str, Dict[str, Any]] = {}
+        self.updated_at: Dict[str, float] = {}
+
+    def on_quote(self, symbol: str, data: Dict[str, Any]):
+        """StockClient listener: fold new quote fields into the symbol's groups"""
+        info = self.stock_universe.get(symbol)
+        if info is None:
+            return
+        self.updated_at[symbol] = time.monotonic()
+        latest = self._latest.setdefault(symbol, {
+            "symbol": symbol, "name": info.name, "sector": info.sector, "industry": info.industry,
+        })
+        changed = False
+        for field in self.MEMBER_FIELDS:
+            if field in data and data[field] != latest.get(field):
+                latest[field] = data[field]
+                changed = True
+        if not changed:
+            return
+        for group_type in GROUP_TYPES:
+            self.groups[(group_type, getattr(info, group_type).lower())].update(latest)
+
+    def expire(self, max_age: float = None):
+        """Drop members whose latest quote is older than max_age seconds from their groups"""
+        max_age = Config.QUOTE_CACHE_TTL if max_age is None else max_age
+        cutoff = time.monotonic() - max_age
+        for symbol in [s for s, seen in self.updated_at.items() if seen < cutoff]:
+            del self.updated_at[symbol]
+            self._latest.pop(symbol, None)
+            info = self.stock_universe[symbol]
+            for group_type in GROUP_TYPES:
+                self.groups[(group_type, getattr(info, group_type).lower())].remove(symbol)
+
+    def get(self, group_type: str, name: str) -> Optional[GroupAggregate]:
+        return self.groups.get((group_type, name.lower()))
+
+    def list(self, group_type: str) -> List[GroupAggregate]:
+        return [g for (t, _), g in self.groups.items() if t == group_type]
+
+    def match_query(self, query: str) -> Optional[Tuple[GroupAggregate, bool]]:
+        """Group a query asks about (e.g. "top gainers in Energy"), plus whether it wants losers"""
+        words = set(_stems(query))
+        raw_words = set(re.sub(r"[^a-z0-9]+", " ", query.lower()).split())
+        if not raw_words & GROUP_INTENT_WORDS and not {"how", "doing"} <= raw_words:
+            return None
+        for key, stems in self._group_stems:
+            if stems and all(stem in words for stem in stems):
+                return self.groups[key], bool(raw_words & LOSER_WORDS)
+        return None
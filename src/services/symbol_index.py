@@ -0,0 +1,227 @@
+# src/services/symbol_index.py
+
+import re
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+# Words that don't identify a company on their own
+CORPORATE_SUFFIXES = {
+    "inc", "corp", "corporation", "co", "company", "group", "holding", "holdings",
+    "trust", "ltd", "plc", "the", "of", "and", "com",
+}
+
+# Everyday words from company names that shouldn't pick a company by themselves
+# ("micro" is not AMD, "materials" is not AMAT). Matched exactly, unlike the
+# group vocabulary, so "microsoft" is still distinctive.
+COMMON_NAME_WORDS = {
+    "advanced", "applied", "micro", "devices", "materials", "digital", "realty",
+    "platforms", "america", "american", "systems", "technologies", "international",
+    "global", "general", "united", "mobil", "chase",
+}
+
+# Words people add around a company name ("nvidia stock", "apple shares")
+FILLER_WORDS = {"stock", "stocks", "share", "shares", "price", "prices", "quote", "quotes", "ticker", "equity"}
+
+# Match ranks, lower is better
+EXACT_SYMBOL, EXACT_NAME, FUZZY = 0, 1, 2
+
+def normalize(text: str) -> str:
+    """Lowercase and collapse punctuation/whitespace to single spaces"""
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up early once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+def trigrams(word: str) -> Set[str]:
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class Trie:
+    """Prefix tree where every node knows which symbols lie beneath it"""
+
+    def __init__(self):
+        self.root = {"children": {}, "symbols": set(), "terminal": set()}
+
+    def insert(self, word: str, symbol: str):
+        node = self.root
+        node["symbols"].add(symbol)
+        for char in word:
+            node = node["children"].setdefault(char, {"children": {}, "symbols": set(), "terminal": set()})
+            node["symbols"].add(symbol)
+        node["terminal"].add(symbol)
+
+    def _find(self, word: str) -> Optional[dict]:
+        node = self.root
+        for char in word:
+            node = node["children"].get(char)
+            if node is None:
+                return None
+        return node
+
+    def exact(self, word: str) -> Set[str]:
+        node = self._find(word)
+        return set(node["terminal"]) if node else set()
+
+    def prefix(self, word: str) -> Set[str]:
+        node = self._find(word)
+        return set(node["symbols"]) if node else set()
+
+class SymbolIndex:
+    """In-memory lookup of stocks by ticker, company name or a near-miss of either.
+
+    resolve() maps a free-text query to a single symbol only when the match
+    is unambiguous; suggest() backs the typeahead search box.
+    """
+
+    def __init__(self, stock_universe: Dict[str, Any]):
+        self.stock_universe = stock_universe
+        self.symbols = Trie()
+        self.names = Trie()
+        self.tokens = Trie()       # Distinctive name words, used for resolving
+        self.all_tokens = Trie()   # Every name word, used for typeahead
+        self.fuzzy_words: Dict[str, Set[str]] = {}
+        self.trigram_index: Dict[str, Set[str]] = {}
+
+        # Sector/industry vocabulary describes groups, not companies
+        self.generic_words = set(CORPORATE_SUFFIXES)
+        for info in stock_universe.values():
+            for word in normalize(f"{info.sector} {info.industry}").split():
+                self.generic_words.update({word, word.rstrip("s"), word + "s"})
+
+        for symbol, info in stock_universe.items():
+            self._add(symbol, info.name)
+
+    def _add(self, symbol: str, name: str):
+        symbol_key = symbol.lower()
+        self.symbols.insert(symbol_key, symbol)
+        self._add_fuzzy_word(symbol_key, symbol)
+
+        full_name = normalize(name)
+        self.names.insert(full_name, symbol)
+        # "Bank of America Corp." is also known as "bank of america"
+        core_words = full_name.split()
+        while len(core_words) > 1 and core_words[-1] in CORPORATE_SUFFIXES:
+            core_words.pop()
+        self.names.insert(" ".join(core_words), symbol)
+        for word in full_name.split():
+            self.all_tokens.insert(word, symbol)
+            if not self._is_generic(word):
+                self.tokens.insert(word, symbol)
+                self._add_fuzzy_word(word, symbol)
+
+    def _add_fuzzy_word(self, word: str, symbol: str):
+        self.fuzzy_words.setdefault(word, set()).add(symbol)
+        for gram in trigrams(word):
+            self.trigram_index.setdefault(gram, set()).add(word)
+
+    def _is_generic(self, word: str) -> bool:
+        if word in self.generic_words or word in COMMON_NAME_WORDS:
+            return True
+        # "bank" vs "banking", "semi" vs "semiconductors"
+        return len(word) >= 4 and any(g.startswith(word) or word.startswith(g)
+                                      for g in self.generic_words if len(g) >= 4)
+
+    def _fuzzy(self, word: str) -> Dict[str, int]:
+        """Symbols whose ticker or distinctive name word is within a small edit distance"""
+        if len(word) < 3:
+            return {}
+        limit = 1 if len(word) <= 6 else 2
+        grams = trigrams(word)
+        candidates = set()
+        for gram in grams:
+            candidates.update(self.trigram_index.get(gram, ()))
+
+        matches: Dict[str, int] = {}
+        for candidate in candidates:
+            # Short tickers only match same-length typos ("appl" -> "aapl", not "gas" -> "gs")
+            if len(candidate) <= 5 and candidate.upper() in self.stock_universe and len(candidate) != len(word):
+                continue
+            distance = edit_distance(word, candidate, limit)
+            if distance <= limit:
+                for symbol in self.fuzzy_words[candidate]:
+                    matches[symbol] = min(distance, matches.get(symbol, distance))
+        return matches
+
+    def _score(self, query: str) -> Dict[str, Tuple[int, int]]:
+        """Best match rank per symbol, plus how many other signals agreed.
+
+        Only whole symbols, names and distinctive name words count (or a close
+        misspelling of one); partial words are left to suggest().
+        """
+        scores: Dict[str, List[int]] = {}
+
+        def add(symbols, rank):
+            for symbol in symbols:
+                scores.setdefault(symbol, []).append(rank)
+
+        words = query.split()
+        add(self.symbols.exact(query), EXACT_SYMBOL)
+        add(self.names.exact(query), EXACT_NAME)
+        if all(self._is_generic(word) for word in words):
+            # "bank", "real estate", "tech": a group, not a company
+            return {symbol: (min(ranks), -1) for symbol, ranks in scores.items()}
+
+        if len(words) == 1:
+            add(self.tokens.exact(query), EXACT_NAME)
+            add(self._fuzzy(query), FUZZY)
+
+        return {symbol: (min(ranks), -len(ranks)) for symbol, ranks in scores.items()}
+
+    def resolve(self, query: str) -> Optional[str]:
+        """Return the one symbol query clearly refers to, or None"""
+        words = normalize(query).split()
+        query = " ".join(w for w in words if w not in FILLER_WORDS) or " ".join(words)
+        if not query:
+            return None
+        scores = self._score(query)
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: item[1])
+        if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+            return None  # Ambiguous, let the full query pipeline decide
+        return ranked[0][0]
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Typeahead matches for a partially typed ticker or company name"""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        ranks: Dict[str, int] = {}
+
+        def add(symbols, rank):
+            for symbol in symbols:
+                ranks[symbol] = min(rank, ranks.get(symbol, rank))
+
+        add(self.symbols.exact(prefix), 0)
+        add(self.symbols.prefix(prefix), 1)
+        add(self.names.prefix(prefix), 2)
+        if " " not in prefix:
+            add(self.all_tokens.prefix(prefix), 3)
+        if len(ranks) < limit:
+            add(self._fuzzy(prefix), 4)
+
+        ordered = sorted(ranks, key=lambda symbol: (ranks[symbol], symbol))[:limit]
+        return [
+            {
+                "symbol": symbol,
+                "name": self.stock_universe[symbol].name,
+                "sector": self.stock_universe[symbol].sector,
+                "industry": self.stock_universe[symbol].industry,
+            }
+            for symbol in ordered
+        ]
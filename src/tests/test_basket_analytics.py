@@ -0,0 +1,58 @@
+# src/tests/test_basket_analytics.py
+
+import pytest
+from src.services.basket_analytics import BasketAnalytics
+from datetime import date, timedelta
+
+def _series(returns, start=100.0):
+    dates, prices, price = [], [], start
+    day = date(2024, 1, 1)
+    for r in [0.0] + returns:
+        price *= 1 + r
+        dates.append(day.strftime('%Y-%m-%d'))
+        prices.append(price)
+        day += timedelta(days=1)
+    return {"dates": dates, "prices": prices}
+
+class StubStockClient:
+    """Serves canned histories instead of calling Yahoo Finance"""
+    def __init__(self, histories):
+        self.histories = histories
+
+    async def get_historical_data(self, symbol, days=365):
+        return self.histories.get(symbol)
+
+@pytest.mark.asyncio
+async def test_basket_metrics():
+    """Beta, correlation and drawdown match hand-computed values"""
+    market = [0.01, -0.02, 0.015, -0.005, 0.02, -0.01]
+    client = StubStockClient({
+        "SPY": _series(market),
+        "LEV": _series([2 * r for r in market]),
+        "INV": _series([-r for r in market]),
+    })
+    result = await BasketAnalytics(client).analyze(["lev", "INV", "NOPE"], benchmark="SPY", rolling_window=2)
+
+    assert result["symbols"] == ["LEV", "INV"]
+    assert result["missing"] == ["NOPE"]
+    assert result["observations"] == 7
+    assert result["metrics"]["LEV"]["beta"] == pytest.approx(2.0, abs=1e-3)
+    assert result["metrics"]["INV"]["beta"] == pytest.approx(-1.0, abs=1e-3)
+    assert result["correlation"]["matrix"][0][1] == pytest.approx(-1.0, abs=1e-3)
+    assert result["metrics"]["LEV"]["max_drawdown"] == pytest.approx(-0.04, abs=1e-3)
+
+@pytest.mark.asyncio
+async def test_large_basket_is_analyzed():
+    """A 500-symbol basket with cached histories gets a full metrics set"""
+    import numpy as np
+    rng = np.random.default_rng(0)
+    histories = {"SPY": _series(list(rng.normal(0, 0.01, 250)))}
+    for i in range(500):
+        histories[f"S{i}"] = _series(list(rng.normal(0, 0.02, 250)))
+    analytics = BasketAnalytics(StubStockClient(histories))
+
+    result = await analytics.analyze([f"S{i}" for i in range(500)], benchmark=None)
+
+    assert result["benchmark"] == "SPY"
+    assert len(result["metrics"]) == 500
+    assert len(result["correlation"]["matrix"]) == 500
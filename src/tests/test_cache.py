@@ -0,0 +1,87 @@
+# src/tests/test_cache.py
+
+import pytest
+from src.config import Config
+from src.data.cache import SQLiteCache, MemoryCache
+import asyncio
+import sqlite3
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_shared_between_instances(tmp_path):
+    """Values written by one worker's cache are visible to another"""
+    path = str(tmp_path / "cache.db")
+    first = SQLiteCache(path)
+    second = SQLiteCache(path)
+
+    await first.set("quote:AAPL", {"symbol": "AAPL", "current_price": 190.5}, ttl=60)
+    assert await second.get("quote:AAPL") == {"symbol": "AAPL", "current_price": 190.5}
+
+    await first.set("quote:MSFT", {"symbol": "MSFT"}, ttl=-1)
+    assert await second.get("quote:MSFT") is None
+
+@pytest.mark.asyncio
+async def test_get_or_fetch_fetches_once_across_workers(tmp_path):
+    """Concurrent misses on the same key trigger a single upstream fetch"""
+    path = str(tmp_path / "cache.db")
+    workers = [SQLiteCache(path) for _ in range(4)]
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"symbol": "NVDA"}
+
+    results = await asyncio.gather(*[
+        cache.get_or_fetch("quote:NVDA", 60, fetch) for cache in workers
+    ])
+
+    assert len(calls) == 1
+    assert all(result == {"symbol": "NVDA"} for result in results)
+
+@pytest.mark.asyncio
+async def test_get_or_fetch_does_not_cache_failures():
+    """None results are retried on the next lookup"""
+    cache = MemoryCache()
+    values = [None, {"symbol": "GS"}]
+
+    async def fetch():
+        return values.pop(0)
+
+    assert await cache.get_or_fetch("quote:GS", 60, fetch) is None
+    assert await cache.get_or_fetch("quote:GS", 60, fetch) == {"symbol": "GS"}
+    assert await cache.get_or_fetch("quote:GS", 60, fetch) == {"symbol": "GS"}
+    assert cache.stats()["hits"] == 1
+
+@pytest.mark.asyncio
+async def test_locked_sqlite_cache_falls_back_to_fetch(tmp_path, monkeypatch):
+    """A write lock held by another worker turns into a miss, not a stalled loop"""
+    monkeypatch.setattr(Config, "CACHE_BUSY_TIMEOUT", 0.05)
+    path = str(tmp_path / "cache.db")
+    cache = SQLiteCache(path)
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        async def fetch():
+            return {"price": 1}
+        assert await cache.get_or_fetch("price:AAPL", 60, fetch) == {"price": 1}
+        await cache.set("price:MSFT", {"price": 2}, ttl=60)
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+    assert await cache.get("price:MSFT") is None
+
+@pytest.mark.asyncio
+async def test_sqlite_close_closes_every_thread_connection(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.db"))
+    await asyncio.gather(*[cache.set(f"price:{i}", {"price": i}, ttl=60) for i in range(8)])
+    connections = list(cache._connections)
+    assert len(connections) > 1
+
+    await cache.close()
+    for conn in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    # The cache keeps working with fresh connections
+    await cache.set("price:AAPL", {"price": 1}, ttl=60)
+    assert await cache.get("price:AAPL") == {"price": 1}
+    await cache.close()
@@ -0,0 +1,33 @@
+# src/tests/test_loadtest.py
+
+from src.loadtest.runner import percentile, summarize, compare_to_baseline
+
+def _samples(endpoint, latencies, failures=0):
+    return [
+        {"endpoint": endpoint, "ok": i >= failures, "latency_ms": latency}
+        for i, latency in enumerate(latencies)
+    ]
+
+def test_summarize_reports_percentiles_and_error_rates():
+    samples = _samples("stocks", range(1, 101)) + _samples("search", [500, 700], failures=1)
+    report = summarize(samples, lag_samples=[0.5, 1.0, 40.0], elapsed=2.0)
+
+    assert report["requests"] == 102
+    assert report["throughput_rps"] == 51.0
+    assert report["endpoints"]["stocks"]["latency_ms"]["p50"] == 50
+    assert report["endpoints"]["stocks"]["latency_ms"]["p99"] == 99
+    assert report["endpoints"]["search"]["error_rate"] == 0.5
+    assert report["event_loop_lag_ms"]["max"] == 40.0
+    assert percentile([], 99) is None
+
+def test_compare_to_baseline_flags_only_real_regressions():
+    baseline = summarize(_samples("stocks", [10] * 100), [1.0] * 10, elapsed=1.0)
+    similar = summarize(_samples("stocks", [11] * 100), [1.2] * 10, elapsed=1.0)
+    slower = summarize(_samples("stocks", [40] * 50, failures=5), [80.0] * 10, elapsed=1.0)
+
+    assert compare_to_baseline(similar, baseline) == []
+    regressions = compare_to_baseline(slower, baseline)
+    assert {r.split(":")[0] for r in regressions} == {
+        "throughput_rps", "latency_ms.p50", "latency_ms.p95", "latency_ms.p99",
+        "event_loop_lag_ms.p99", "error_rate",
+    }
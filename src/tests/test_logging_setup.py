@@ -0,0 +1,94 @@
+# src/tests/test_logging_setup.py
+
+import io
+import json
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.config import Config
+from src.logging_setup import (
+    LazyPayload, RequestContextMiddleware, configure_logging, shutdown_logging, timed_stage
+)
+
+class RenderCounter:
+    renders = 0
+
+    def __repr__(self):
+        RenderCounter.renders += 1
+        return "rendered"
+
+@pytest.fixture
+def json_logs():
+    """Route root logging through the queued JSON handler into a buffer"""
+    root = logging.getLogger()
+    previous_level, previous_handlers = root.level, root.handlers[:]
+    for handler in previous_handlers:
+        root.removeHandler(handler)
+    stream = io.StringIO()
+    configure_logging(mode="json", level="INFO", stream=stream)
+
+    def read():
+        shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+    yield read
+    shutdown_logging()
+    root.setLevel(previous_level)
+    for handler in previous_handlers:
+        root.addHandler(handler)
+
+def test_lazy_payload_is_bounded():
+    history = {"dates": [f"2024-01-{i:02d}" for i in range(1, 29)] * 40, "prices": list(range(1000))}
+    text = str(LazyPayload(history, max_chars=120))
+    assert len(text) < 160
+    assert text.endswith("chars)") or "..." in text
+
+def test_payloads_are_not_rendered_below_level(json_logs):
+    RenderCounter.renders = 0
+    logging.getLogger("test").debug("payload: %s", LazyPayload(RenderCounter()))
+    assert RenderCounter.renders == 0
+    logging.getLogger("test").info("payload: %s", LazyPayload(RenderCounter()))
+    records = json_logs()
+    assert [r["message"] for r in records] == ["payload: rendered"]
+
+def test_exception_traceback_is_a_separate_field(json_logs):
+    try:
+        raise RuntimeError("boom")
+    except RuntimeError:
+        logging.getLogger("test").exception("failed for %s", "AAPL")
+    [record] = json_logs()
+    assert record["message"] == "failed for AAPL"
+    assert record["exc_info"].startswith("Traceback")
+    assert "RuntimeError: boom" in record["exc_info"]
+
+def test_debug_sampling_drops_only_debug(monkeypatch):
+    monkeypatch.setattr(Config, "LOG_DEBUG_SAMPLE_RATE", 0.0)
+    stream = io.StringIO()
+    try:
+        configure_logging(mode="text", level="DEBUG", stream=stream)
+        logging.getLogger("test").debug("dropped")
+        logging.getLogger("test").warning("kept")
+    finally:
+        shutdown_logging()
+    assert "dropped" not in stream.getvalue()
+    assert "kept" in stream.getvalue()
+
+def test_request_summary_has_id_and_stage_timings(json_logs):
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/work")
+    async def work():
+        with timed_stage("parse"):
+            logging.getLogger("test").info("inside request")
+        return {"ok": True}
+
+    response = TestClient(app).get("/work", headers={"X-Request-ID": "abc123"})
+    assert response.headers["x-request-id"] == "abc123"
+
+    records = json_logs()
+    inside = next(r for r in records if r["message"] == "inside request")
+    summary = next(r for r in records if r.get("path") == "/work")
+    assert inside["request_id"] == summary["request_id"] == "abc123"
+    assert summary["status"] == 200
+    assert set(summary["stages"]) == {"parse"}
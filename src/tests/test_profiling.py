@@ -0,0 +1,73 @@
+# src/tests/test_profiling.py
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.config import Config
+from src.services.profiling import install_profiling
+
+def build_app():
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    return app
+
+def test_disabled_profiling_adds_no_middleware(monkeypatch):
+    monkeypatch.setattr(Config, "PROFILE_TOKEN", None)
+    monkeypatch.setattr(Config, "PROFILE_SAMPLE_RATE", 0.0)
+    app = build_app()
+    assert install_profiling(app) is False
+    assert app.user_middleware == []
+
+def test_token_request_saves_profile(monkeypatch, tmp_path):
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(Config, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(Config, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+    app = build_app()
+    assert install_profiling(app) is True
+    client = TestClient(app)
+
+    plain = client.get("/ping")
+    assert "x-profile-id" not in plain.headers
+    assert client.get("/ping", headers={"X-Profile": "wrong"}).headers.get("x-profile-id") is None
+
+    profiled = client.get("/ping?profile=secret")
+    assert profiled.json() == {"ok": True}
+    profile_id = profiled.headers["x-profile-id"]
+    assert (tmp_path / profile_id).exists()
+
+    url = profiled.headers["x-profile-url"]
+    assert client.get(url).status_code == 403
+    download = client.get(url, headers={"X-Profile": "secret"})
+    assert download.status_code == 200
+    assert "speedscope" in download.text
+
+def test_sampled_profile_without_token_has_no_download_url(monkeypatch, tmp_path):
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(Config, "PROFILE_TOKEN", None)
+    monkeypatch.setattr(Config, "PROFILE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+    app = build_app()
+    install_profiling(app)
+
+    response = TestClient(app).get("/ping")
+    assert (tmp_path / response.headers["x-profile-id"]).exists()
+    assert "x-profile-url" not in response.headers
+
+def test_non_ascii_token_is_rejected_not_an_error(monkeypatch, tmp_path):
+    pytest.importorskip("pyinstrument")
+    monkeypatch.setattr(Config, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(Config, "PROFILE_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(Config, "PROFILE_DIR", str(tmp_path))
+    app = build_app()
+    install_profiling(app)
+    client = TestClient(app)
+
+    response = client.get("/ping?profile=%C3%A9")
+    assert response.status_code == 200
+    assert "x-profile-id" not in response.headers
+    assert client.get("/ping", headers={"X-Profile": "é".encode()}).status_code == 200
+    assert client.get("/profiles/x?profile=%C3%A9").status_code == 403
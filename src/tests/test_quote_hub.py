@@ -0,0 +1,119 @@
+# src/tests/test_quote_hub.py
+
+import pytest
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from src.services.quote_hub import QuoteHub
+
+class CountingStockClient:
+    """Returns scripted quotes and counts upstream lookups per symbol"""
+    def __init__(self):
+        self.prices = {"AAPL": 190.0, "MSFT": 410.0}
+        self.calls = {}
+
+    async def get_price(self, symbol, max_age=None):
+        self.calls[symbol] = self.calls.get(symbol, 0) + 1
+        return {"symbol": symbol, "current_price": self.prices[symbol], "volume": 1000}
+
+def _drain(subscription):
+    messages = []
+    while not subscription.queue.empty():
+        messages.append(subscription.queue.get_nowait())
+    return messages
+
+@pytest.mark.asyncio
+async def test_one_fetch_per_symbol_regardless_of_subscribers():
+    """Upstream polls scale with distinct symbols, not connected clients"""
+    client = CountingStockClient()
+    hub = QuoteHub(client, poll_interval=1)
+    subscribers = [hub.connect() for _ in range(10)]
+    for subscription in subscribers:
+        hub.subscribe(subscription, ["aapl", "MSFT"])
+
+    await hub.poll_once()
+
+    assert client.calls == {"AAPL": 1, "MSFT": 1}
+    for subscription in subscribers:
+        messages = _drain(subscription)
+        assert {m["symbol"] for m in messages} == {"AAPL", "MSFT"}
+
+@pytest.mark.asyncio
+async def test_only_changed_fields_are_sent():
+    client = CountingStockClient()
+    hub = QuoteHub(client, poll_interval=1)
+    subscription = hub.connect()
+    hub.subscribe(subscription, ["AAPL"])
+    await hub.poll_once()
+    _drain(subscription)
+
+    await hub.poll_once()
+    assert _drain(subscription) == []
+
+    client.prices["AAPL"] = 191.5
+    await hub.poll_once()
+    assert _drain(subscription) == [
+        {"type": "quote", "symbol": "AAPL", "changes": {"current_price": 191.5}}
+    ]
+
+@pytest.mark.asyncio
+async def test_slow_consumer_is_dropped():
+    """A subscriber whose outbox fills up is disconnected, others keep receiving"""
+    client = CountingStockClient()
+    hub = QuoteHub(client, poll_interval=1, max_queue=2)
+    slow = hub.connect()
+    fast = hub.connect()
+    hub.subscribe(slow, ["AAPL"])
+    hub.subscribe(fast, ["AAPL"])
+
+    for price in (191.0, 192.0, 193.0):
+        client.prices["AAPL"] = price
+        await hub.poll_once()
+        _drain(fast)
+
+    assert slow.dropped
+    assert _drain(slow) == [None]
+    assert hub.watchers["AAPL"] == {fast}
+
+def test_quote_socket_subscribe_delta_unsubscribe_and_slow_close(monkeypatch):
+    import main
+
+    client = CountingStockClient()
+    hub = QuoteHub(client, poll_interval=1, max_queue=3)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.services = SimpleNamespace(quote_hub=hub)
+        yield
+    monkeypatch.setattr(main.app.router, "lifespan_context", lifespan)
+
+    with TestClient(main.app) as http, http.websocket_connect("/ws/quotes") as ws:
+        ws.send_json({"action": "subscribe", "symbols": ["aapl"]})
+        assert ws.receive_json() == {"type": "subscribed", "symbols": ["AAPL"]}
+
+        http.portal.call(hub.poll_once)
+        assert ws.receive_json()["changes"]["current_price"] == 190.0
+        client.prices["AAPL"] = 191.5
+        http.portal.call(hub.poll_once)
+        assert ws.receive_json() == {"type": "quote", "symbol": "AAPL", "changes": {"current_price": 191.5}}
+
+        # Bad messages get an error reply and the socket stays open
+        for bad in ("not json", "[1, 2]", '{"action": "subscribe", "symbols": [1]}'):
+            ws.send_text(bad)
+            assert ws.receive_json()["type"] == "error"
+
+        ws.send_json({"action": "unsubscribe", "symbols": ["AAPL"]})
+        assert ws.receive_json() == {"type": "unsubscribed", "symbols": ["AAPL"]}
+        assert hub.watchers == {}
+
+        # Overflow the outbox before the sender can drain it
+        [subscription] = hub.subscriptions
+
+        async def flood():
+            for i in range(hub.max_queue + 1):
+                hub.send(subscription, {"type": "quote", "symbol": "AAPL", "changes": {"volume": i}})
+        http.portal.call(flood)
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+        assert closed.value.code == 1013
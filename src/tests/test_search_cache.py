@@ -0,0 +1,46 @@
+# src/tests/test_search_cache.py
+
+import pytest
+from src.services.query_processor import QueryProcessor
+from src.tests.helpers import CountingLLM, OfflineStockClient
+
+@pytest.fixture
+def processor():
+    return QueryProcessor(CountingLLM(), OfflineStockClient())
+
+@pytest.mark.asyncio
+async def test_equivalent_queries_share_cached_response(processor):
+    first = await processor.process_query("semiconductor stocks", include_historical=False)
+    analyses = processor.llm_service.analyses
+    second = await processor.process_query("Semiconductor   stocks!", include_historical=False)
+    third = await processor.process_query("chip makers", include_historical=False)
+
+    assert second["results"] == first["results"]
+    assert third["query"] == "chip makers"
+    # One parse for each distinct normalized query, no further analyses
+    assert processor.llm_service.parses == 2
+    assert processor.llm_service.analyses == analyses
+    stats = processor.search_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["bytes"] > 0
+
+    # Different request parameters are a different entry
+    await processor.process_query("semiconductor stocks", include_historical=True)
+    assert processor.search_cache.stats()["entries"] == 2
+
+@pytest.mark.asyncio
+async def test_new_price_invalidates_entries(processor):
+    await processor.process_query("semiconductor stocks", include_historical=False)
+    cache = processor.search_cache
+
+    # The same price seen again keeps the entry
+    cache.on_quote("NVDA", {"current_price": 100.0})
+    assert cache.stats()["entries"] == 1
+    # Unrelated symbols don't touch it
+    cache.on_quote("XOM", {"current_price": 50.0})
+    assert cache.stats()["entries"] == 1
+
+    cache.on_quote("NVDA", {"current_price": 101.5})
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 1
+    assert cache.bytes == 0 and cache.dependents == {}
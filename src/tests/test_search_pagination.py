@@ -0,0 +1,78 @@
+# src/tests/test_search_pagination.py
+
+import pytest
+from src.services.query_processor import InvalidCursorError, QueryProcessor
+from src.tests.helpers import CountingLLM, OfflineStockClient
+
+MARKET_CAPS = {"NVDA": 3e12, "TSM": 8e11, "AMD": 2e11, "INTC": 2e11}
+
+class RankedStockClient(OfflineStockClient):
+    def _fetch_market_cap(self, symbol):
+        self.calls.append(("market_cap", symbol))
+        return {"market_cap": MARKET_CAPS.get(symbol, 1e9), "market_cap_formatted": "n/a"}
+
+@pytest.mark.asyncio
+async def test_pages_follow_market_cap_with_stable_cursor():
+    client = RankedStockClient()
+    processor = QueryProcessor(CountingLLM(), client)
+
+    first = await processor.process_query("semiconductors", include_historical=True, limit=3)
+    assert first["results_count"] == 4
+    assert [s["symbol"] for s in first["results"]] == ["NVDA", "TSM", "AMD"]
+    # Only the returned page is analyzed and gets history
+    assert processor.llm_service.analyses == 3
+    assert sorted(s for kind, s in client.calls if kind == "history") == ["AMD", "NVDA", "TSM"]
+    assert all("historical_data" in s for s in first["results"])
+
+    second = await processor.process_query("semiconductors", include_historical=True, limit=3,
+                                           cursor=first["next_cursor"])
+    assert [s["symbol"] for s in second["results"]] == ["INTC"]
+    assert second["next_cursor"] is None
+
+@pytest.mark.asyncio
+async def test_cursor_from_another_query_is_rejected():
+    processor = QueryProcessor(CountingLLM(), RankedStockClient())
+    first = await processor.process_query("semiconductors", include_historical=False, limit=1)
+
+    processor.llm_service.process_query = _parse_as_energy
+    with pytest.raises(InvalidCursorError, match="does not belong to this query"):
+        await processor.process_query("energy", include_historical=False, cursor=first["next_cursor"])
+
+    with pytest.raises(InvalidCursorError, match="Invalid cursor"):
+        await processor.process_query("energy", include_historical=False, cursor="not-a-cursor")
+
+@pytest.mark.asyncio
+async def test_unpaged_answers_have_no_cursor_and_reject_one():
+    processor = QueryProcessor(CountingLLM(), RankedStockClient())
+    cursor = (await processor.process_query("semiconductors", include_historical=False, limit=1))["next_cursor"]
+
+    for query in ("NVDA", "how are semiconductors doing"):
+        result = await processor.process_query(query, include_historical=False)
+        assert result["results"] and result["next_cursor"] is None
+        with pytest.raises(InvalidCursorError):
+            await processor.process_query(query, include_historical=False, cursor=cursor)
+
+@pytest.mark.asyncio
+async def test_unreturned_matches_and_market_cap_invalidate_entries():
+    processor = QueryProcessor(CountingLLM(), RankedStockClient())
+    cache = processor.search_cache
+    first = await processor.process_query("semiconductors", include_historical=False, limit=1)
+    assert [s["symbol"] for s in first["results"]] == ["NVDA"]
+
+    # TSM isn't on the page but would overtake NVDA with a bigger market cap
+    cache.on_quote("TSM", {"market_cap": 8e11, "market_cap_formatted": "n/a"})
+    assert cache.stats()["entries"] == 1
+    cache.on_quote("TSM", {"market_cap": 4e12, "market_cap_formatted": "n/a"})
+    assert cache.stats()["entries"] == 0
+
+    await processor.process_query("semiconductors", include_historical=False, limit=1)
+    cache.on_quote("TSM", {"current_price": 101.0})
+    assert cache.stats()["entries"] == 0
+
+    await processor.process_query("semiconductors", include_historical=False, limit=1)
+    cache.on_quote("NVDA", {"market_cap": 1e11, "market_cap_formatted": "n/a"})
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["invalidations"] == 3
+
+async def _parse_as_energy(query):
+    return {"sectors": ["Energy"], "industries": [], "keywords": [], "description": "Energy stocks"}
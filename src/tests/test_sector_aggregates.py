@@ -0,0 +1,89 @@
+# src/tests/test_sector_aggregates.py
+
+import pytest
+import random
+import statistics
+from src.config import Config
+from src.services.query_processor import QueryProcessor
+from src.services.sector_aggregates import RunningMedian, SectorAggregates
+from src.tests.helpers import CountingLLM, OfflineStockClient
+
+def test_running_median_matches_full_recompute():
+    rng = random.Random(7)
+    median, values = RunningMedian(), []
+    for _ in range(2000):
+        if values and rng.random() < 0.4:
+            value = values.pop(rng.randrange(len(values)))
+            median.remove(value)
+        else:
+            value = round(rng.uniform(-5, 5), 1)
+            values.append(value)
+            median.add(value)
+        assert median.median() == (statistics.median(values) if values else None)
+
+def test_updates_replace_previous_contribution():
+    aggregates = SectorAggregates(QueryProcessor(None, None).stock_universe)
+    aggregates.on_quote("NVDA", {"daily_change_percent": 3.0, "volume": 100, "market_cap": 2e12})
+    aggregates.on_quote("AMD", {"daily_change_percent": -1.0, "volume": 50})
+    aggregates.on_quote("INTC", {"daily_change_percent": 0.5, "volume": 10})
+    aggregates.on_quote("NVDA", {"daily_change_percent": -2.0, "volume": 120})
+
+    snapshot = aggregates.get("industry", "semiconductors").snapshot(top=2)
+    assert snapshot["reporting"] == 3
+    assert snapshot["average_change_percent"] == -0.83
+    assert snapshot["median_change_percent"] == -1.0
+    assert snapshot["total_volume"] == 180
+    assert snapshot["total_market_cap"] == 2e12
+    assert (snapshot["advancers"], snapshot["decliners"]) == (1, 2)
+    assert [m["symbol"] for m in snapshot["top_gainers"]] == ["INTC", "AMD"]
+    assert [m["symbol"] for m in snapshot["top_losers"]] == ["NVDA", "AMD"]
+
+    # The sector sees the same quotes
+    assert aggregates.get("sector", "Technology").snapshot()["reporting"] == 3
+
+def test_old_quotes_expire_from_aggregates():
+    aggregates = SectorAggregates(QueryProcessor(None, None).stock_universe)
+    aggregates.on_quote("NVDA", {"daily_change_percent": 3.0, "volume": 100})
+    aggregates.on_quote("AMD", {"daily_change_percent": -1.0, "volume": 50})
+    aggregates.updated_at["NVDA"] -= Config.QUOTE_CACHE_TTL + 1
+    aggregates.expire()
+
+    snapshot = aggregates.get("industry", "semiconductors").snapshot()
+    assert (snapshot["reporting"], snapshot["average_change_percent"], snapshot["total_volume"]) == (1, -1.0, 50)
+    assert [m["symbol"] for m in snapshot["top_gainers"]] == ["AMD"]
+
+    # The same values seen again count as fresh
+    aggregates.on_quote("NVDA", {"daily_change_percent": 3.0, "volume": 100})
+    assert aggregates.get("industry", "semiconductors").snapshot()["reporting"] == 2
+
+@pytest.mark.asyncio
+async def test_group_query_fetches_members_without_fresh_quotes():
+    client = OfflineStockClient()
+    processor = QueryProcessor(llm_service=None, stock_client=client)
+    await client.get_quotes(["NVDA", "XOM"])
+    client.calls.clear()
+
+    result = await processor.process_query("how are semiconductors doing today")
+    group = processor.sector_aggregates.get("industry", "Semiconductors")
+    assert result["interpreted_as"] == "Aggregate performance of the Semiconductors industry"
+    assert result["aggregate"]["reporting"] == result["aggregate"]["members"] == len(group.symbols)
+    assert {s for kind, s in client.calls if kind == "price"} == group.symbols - {"NVDA"}
+
+@pytest.mark.asyncio
+async def test_incomplete_group_falls_back_to_search():
+    client = OfflineStockClient()
+    client._fetch_price = lambda symbol: None if symbol == "INTC" else OfflineStockClient._fetch_price(client, symbol)
+    processor = QueryProcessor(CountingLLM(), client)
+
+    result = await processor.process_query("how are semiconductors doing", include_historical=False)
+    assert "aggregate" not in result
+    assert "INTC" not in {r["symbol"] for r in result["results"]}
+
+@pytest.mark.asyncio
+async def test_list_queries_are_not_group_queries():
+    processor = QueryProcessor(CountingLLM(), OfflineStockClient())
+    for query in ("top technology stocks", "semiconductor stocks today"):
+        result = await processor.process_query(query, include_historical=False)
+        assert "aggregate" not in result
+        assert result["interpreted_as"].startswith("Semiconductor stocks")
+        assert "next_cursor" in result
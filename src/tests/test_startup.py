@@ -0,0 +1,44 @@
+# src/tests/test_startup.py
+
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+from src.config import Config
+from src.services.container import HEAVY_MODULES
+
+ROOT = Path(__file__).resolve().parents[2]
+
+def test_importing_the_app_skips_heavy_libraries():
+    code = f"import sys, main; print(sorted(set({HEAVY_MODULES!r}) & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == "[]"
+
+@pytest.mark.asyncio
+async def test_lifespan_shares_client_and_defers_database(monkeypatch):
+    import main
+    import src.data.database as database
+
+    monkeypatch.setattr(Config, "CACHE_BACKEND", "memory")
+    created = []
+
+    class RecordingDatabase:
+        def __init__(self):
+            created.append(self)
+
+        async def update_stock_data(self, stock_data):
+            pass
+    monkeypatch.setattr(database, "Database", RecordingDatabase)
+
+    async with main.lifespan(main.app):
+        services = main.app.state.services
+        processor = services.parallel_processor
+        assert processor.stock_client is services.stock_client
+        assert created == []
+
+        async def details(symbol, **kwargs):
+            return {"symbol": symbol, "current_price": 1.0}
+        monkeypatch.setattr(services.stock_client, "get_stock_details", details)
+        await processor.process_stock("AAPL")
+        assert len(created) == 1
@@ -0,0 +1,45 @@
+# src/tests/test_stock_client.py
+
+import pytest
+from src.tests.helpers import OfflineStockClient
+
+@pytest.mark.asyncio
+async def test_get_quotes_fetches_only_requested_fields():
+    client = OfflineStockClient()
+    result = await client.get_quotes(["aapl", "MSFT", "BAD"], fields=["current_price", "daily_change_percent"])
+
+    assert result["results"] == {
+        "AAPL": {"symbol": "AAPL", "current_price": 100.0, "daily_change_percent": 1.01},
+        "MSFT": {"symbol": "MSFT", "current_price": 100.0, "daily_change_percent": 1.01},
+    }
+    assert set(result["errors"]) == {"BAD"}
+    assert {kind for kind, _ in client.calls} == {"price"}
+
+@pytest.mark.asyncio
+async def test_get_quotes_rejects_unknown_fields():
+    with pytest.raises(ValueError):
+        await OfflineStockClient().get_quotes(["AAPL"], fields=["current_price", "pe_ratio"])
+
+@pytest.mark.asyncio
+async def test_get_quotes_reports_symbols_without_requested_fields():
+    class NoMarketCapClient(OfflineStockClient):
+        def _fetch_market_cap(self, symbol):
+            return {} if symbol == "BAD" else super()._fetch_market_cap(symbol)
+
+    result = await NoMarketCapClient().get_quotes(["AAPL", "BAD"], fields=["symbol", "market_cap"])
+
+    assert result["fields"] == ["market_cap"]
+    assert result["results"] == {"AAPL": {"symbol": "AAPL", "market_cap": 1e12}}
+    assert set(result["errors"]) == {"BAD"}
+
+@pytest.mark.asyncio
+async def test_stock_details_reuse_cached_lookups():
+    """Repeated detail requests are served from the cache"""
+    client = OfflineStockClient()
+    first = await client.get_stock_details("AAPL", include_historical=True)
+    second = await client.get_stock_details("AAPL", include_historical=True)
+
+    assert first == second
+    assert first["market_cap_formatted"] == "$1.00T"
+    assert first["historical_data"]["prices"] == [100.0]
+    assert sorted(client.calls) == [("history", "AAPL"), ("market_cap", "AAPL"), ("price", "AAPL")]
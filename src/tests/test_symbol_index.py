@@ -0,0 +1,48 @@
+# src/tests/test_symbol_index.py
+
+import pytest
+from src.services.query_processor import QueryProcessor
+
+@pytest.fixture
+def symbol_index():
+    return QueryProcessor(llm_service=None, stock_client=None).symbol_index
+
+@pytest.mark.parametrize("query,expected", [
+    ("AAPL", "AAPL"),
+    ("  msft ", "MSFT"),
+    ("nvidia", "NVDA"),
+    ("appl", "AAPL"),
+    ("Goldman", "GS"),
+    ("bank of america", "BAC"),
+    ("microsft", "MSFT"),
+    ("Apple Inc.", "AAPL"),
+    ("nvidia stock", "NVDA"),
+    ("apple shares", "AAPL"),
+    ("advanced micro devices", "AMD"),
+])
+def test_resolve_near_matches(symbol_index, query, expected):
+    assert symbol_index.resolve(query) == expected
+
+@pytest.mark.parametrize("query", [
+    "technology",
+    "semiconductor",
+    "bank",
+    "real estate",
+    "gas",
+    "tech stocks with high volume",
+    "how is the semiconductor industry doing today",
+    # Plain words that only start or appear in a company name
+    "gold",
+    "sales",
+    "sale",
+    "materials",
+    "micro",
+])
+def test_group_queries_are_not_resolved(symbol_index, query):
+    """Sector/industry wording must still go through the full query pipeline"""
+    assert symbol_index.resolve(query) is None
+
+def test_suggest_ranks_ticker_matches_first(symbol_index):
+    suggestions = [s["symbol"] for s in symbol_index.suggest("am")]
+    assert suggestions[:3] == ["AMAT", "AMD", "AMZN"]
+    assert [s["symbol"] for s in symbol_index.suggest("gold")] == ["GS"]